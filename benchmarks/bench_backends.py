@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Compares the solver backends (row-major backtracking and Dancing Links) on
+well-known "hardest" puzzles, both for finding a solution and for proving it
+is unique (count_solutions with limit=2).
+
+Usage: python benchmarks/bench_backends.py [--adversarial]
+
+--adversarial also runs the puzzle built against row-major backtracking,
+which keeps the 'backtrack' backend busy for a minute or two.
+"""
+
+import os
+import sys
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sudoku_engine import BACKENDS, count_solutions, solve  # noqa: E402
+
+HARDEST = {
+    'AI Escargot': '1....7.9..3..2...8..96..5....53..9...1..8...26....4...3......1..4......7..7...3..',
+    'Easter Monster': '1.......2.9.4...5...6...7...5.9.3.......7.......85..4.7.....6...3...9.8...2.....1',
+    'Inkala 2010': '..53.....8......2..7..1.5..4....53...1..7...6..32...8..6.5....9..4....3......97..',
+    'Inkala 2012': '8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..',
+}
+ADVERSARIAL = {
+    'Anti-backtracking': '..............3.85..1.2.......5.7.....4...1...9.......5......73..2.1........4...9',
+}
+
+
+def parse(line):
+    return [0 if char == '.' else int(char) for char in line]
+
+
+def measure(function, *args):
+    start = perf_counter()
+    result = function(*args)
+    return perf_counter() - start, result
+
+
+if __name__ == '__main__':
+    puzzles = dict(HARDEST)
+    if '--adversarial' in sys.argv[1:]:
+        puzzles.update(ADVERSARIAL)
+
+    print('{:<20}{:<12}{:>12}{:>16}'.format('puzzle', 'backend', 'solve [s]', 'uniqueness [s]'))
+    totals = {backend: 0.0 for backend in BACKENDS}
+    for name, line in puzzles.items():
+        grid = parse(line)
+        for backend in BACKENDS:
+            solve_time, solution = measure(solve, grid, backend)
+            count_time, count = measure(count_solutions, grid, 2, backend)
+            assert solution is not None and count == 1, name
+            totals[backend] += solve_time + count_time
+            print('{:<20}{:<12}{:>12.4f}{:>16.4f}'.format(name, backend, solve_time, count_time))
+
+    print()
+    for backend in BACKENDS:
+        print('{:<12} total {:.3f}s'.format(backend, totals[backend]))
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Frame time of the click-to-repaint path of the GUI, offscreen: a click on a
+cell of the painted Board of Sudoku.py (highlighting, placing a digit and the
+repaint it triggers) against the same click on a grid of 81 QPushButtons
+restyled with setStyleSheet(), the way the board was built before.
+
+Usage: python benchmarks/bench_board.py [clicks]
+"""
+
+import os
+import sys
+from random import Random
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+os.chdir(ROOT)  # images/
+
+from PyQt5 import QtWidgets  # noqa: E402
+from PyQt5.QtCore import QPoint, Qt  # noqa: E402
+from PyQt5.QtTest import QTest  # noqa: E402
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+import Sudoku  # noqa: E402
+from sudoku_engine.generator import generate_puzzle  # noqa: E402
+from sudoku_engine.tables import AREA, COL_OF, ROW_OF  # noqa: E402
+
+STYLES = {
+    'given': "QPushButton { background-color: #b2b2b2 }",
+    'given_area': "QPushButton { background-color: #8CB164 }",
+    'area': "QPushButton { background-color: #D8FF9C }",
+    'same_digit': "QPushButton { background-color: #73c7ff }",
+    'blank': "QPushButton { background-color: white }",
+    'placed': "QPushButton { border: 2px solid #4476ff; border-radius: 5px; }",
+}
+
+
+class ButtonGrid(QtWidgets.QWidget):
+    """
+    Stand-in for the board before: one QPushButton per cell, every click restyles the 81 buttons.
+    """
+
+    def __init__(self, unsolved):
+        super().__init__()
+        self.resize(450, 450)
+        self.cells = list(unsolved)
+        self.number = 0
+        self.fields = []
+        for cell in range(81):
+            field = QtWidgets.QPushButton(str(unsolved[cell] or ''), self)
+            field.setGeometry(COL_OF[cell] * 50, ROW_OF[cell] * 50, 50, 50)
+            field.clicked.connect(self.click)
+            self.fields.append(field)
+
+    def click(self):
+        cell = self.fields.index(self.sender())
+        number = str(self.number)
+        for x in range(81):
+            if self.fields[x].text() == number:
+                self.fields[x].setStyleSheet(STYLES['same_digit'])
+            else:
+                self.fields[x].setStyleSheet(STYLES['given' if self.cells[x] else 'blank'])
+        for x in AREA[cell]:
+            if self.fields[x].text() != number:
+                self.fields[x].setStyleSheet(STYLES['given_area' if self.cells[x] else 'area'])
+        if not self.cells[cell]:
+            self.sender().setText(number)
+            self.sender().setStyleSheet(STYLES['placed'])
+
+
+def frame_time(app, click):
+    """
+    :return: Milliseconds from a click to the end of the repaint it caused.
+    """
+    app.processEvents()
+    start = perf_counter()
+    click()
+    app.processEvents()
+    return (perf_counter() - start) * 1000
+
+
+def center(cell):
+    return QPoint(COL_OF[cell] * 50 + 25, ROW_OF[cell] * 50 + 25)
+
+
+def report(name, times):
+    times = sorted(times)
+    print('{:<14} p50 {:7.2f} ms   p95 {:7.2f} ms   max {:7.2f} ms'.format(
+        name, times[len(times) // 2], times[int(len(times) * .95)], times[-1]))
+    return times[len(times) // 2]
+
+
+if __name__ == '__main__':
+    clicks = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    app = QApplication(sys.argv)
+    solved, unsolved = generate_puzzle('easy', seed=2019)
+    rng = Random(2019)
+    cells = [rng.randrange(81) for _ in range(clicks)]
+
+    # every click places the right digit (or highlights a given) and is undone before the next one
+    buttons = ButtonGrid(unsolved)
+    buttons.show()
+    pushed = []
+    for cell in cells:
+        buttons.number = solved[cell]
+        pushed.append(frame_time(app, lambda: QTest.mouseClick(buttons.fields[cell], Qt.LeftButton)))
+        buttons.fields[cell].setText(str(unsolved[cell] or ''))
+    buttons.close()
+
+    window = Sudoku.window = Sudoku.SudokuWindow()
+    window.get_grids((solved, unsolved))
+    window.generate_view()
+    window.show_window()
+    painted = []
+    for cell in cells:
+        window.current_number = solved[cell]
+        painted.append(frame_time(app, lambda: QTest.mouseClick(window.board, Qt.LeftButton, pos=center(cell))))
+        window.undo_move()
+
+    before = report('QPushButtons', pushed)
+    after = report('painted Board', painted)
+    print('speedup x{:.1f} at the median'.format(before / after))
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Solves repeated traffic (a small pool of puzzles drawn many times) with and
+without an LRUCache in front of solve_many, in puzzles/sec.
+
+Usage: python benchmarks/bench_cache.py [difficulty] [distinct_puzzles] [requests]
+"""
+
+import os
+import sys
+from random import Random
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sudoku_engine import LRUCache, generate_many, solve_many  # noqa: E402
+
+if __name__ == '__main__':
+    difficulty = sys.argv[1] if len(sys.argv) > 1 else 'hard'
+    distinct = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    requests = int(sys.argv[3]) if len(sys.argv) > 3 else 2000
+
+    pool = [unsolved for _, unsolved in generate_many(difficulty, distinct, workers=1, seed=2019)]
+    rng = Random(2019)
+    traffic = [pool[rng.randrange(distinct)] for _ in range(requests)]
+
+    start = perf_counter()
+    plain = list(solve_many(traffic, workers=1))
+    plain_rate = requests / (perf_counter() - start)
+
+    cache = LRUCache()
+    start = perf_counter()
+    cached = list(solve_many(traffic, workers=1, cache=cache))
+    cached_rate = requests / (perf_counter() - start)
+
+    assert cached == plain
+    print('uncached  {:>8} puzzles  {:12.1f} puzzles/s'.format(requests, plain_rate))
+    print('cached    {:>8} puzzles  {:12.1f} puzzles/s  speedup x{:.1f}  hit rate {:.1%}'.format(
+        requests, cached_rate, cached_rate / plain_rate, cache.stats()['hit_rate']))
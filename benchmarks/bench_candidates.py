@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Compares the bitmask candidate engine with the former list-scan implementation
+of Sudoku._get_possible_inputs, on grid generation and on solve_grid.
+
+Usage: python benchmarks/bench_candidates.py [rounds]
+"""
+
+import os
+import random
+import sys
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sudoku_engine.generator import Sudoku  # noqa: E402
+from sudoku_engine.grid import Grid  # noqa: E402
+
+
+class ListScanSudoku(Sudoku):
+    """
+    The generator and solver as they were before the bitmask engine: every
+    lookup slices the row and rebuilds the column and box lists.
+    """
+
+    def generate_grid(self):
+        self._guess_field_value()
+        return self.grid
+
+    def _get_possible_inputs(self, field):
+        row = self.grid[field-field % 9: field//9*9+9]
+        col = [self.grid[x*9+field % 9] for x in range(9)]
+        trow = field//27
+        tcol = field % 9//3
+        box = [self.grid[trow*27+tcol*3+x+y*9] for y in range(3) for x in range(3)]
+
+        possibilities = [x for x in range(0+1, 9+1) if x not in row and x not in col and x not in box]
+        self.random.shuffle(possibilities)
+        return possibilities
+
+    def _guess_field_value(self, field=0):
+        for current_choice in self._get_possible_inputs(field):
+            self.grid[field] = current_choice
+            if field == 80:
+                return True
+            if self._guess_field_value(field+1):
+                return True
+        self.grid[field] = 0
+        return False
+
+    def solve_grid(self, field=0):
+        if self.grid[field] == 0:
+            for current_choice in self._get_possible_inputs(field):
+                self.grid[field] = current_choice
+                if field == 80:
+                    self.grid[field] = 0
+                    return True
+                if self.solve_grid(field+1):
+                    self.grid[field] = 0
+                    return True
+            self.grid[field] = 0
+            return False
+        elif field == 80:
+            return True
+        else:
+            return self.solve_grid(field+1)
+
+
+def make_puzzles(count, clues):
+    random.seed(2019)
+    puzzles = []
+    for index in range(count):
+        grid = Sudoku(seed=index).generate_grid()
+        for cell in random.sample(range(81), 81 - clues):
+            grid[cell] = 0
+        puzzles.append(grid)
+    return puzzles
+
+
+def time_generation(cls, rounds):
+    start = perf_counter()
+    for seed in range(rounds):
+        cls(seed=seed).generate_grid()
+    return perf_counter() - start
+
+
+def time_solving(cls, puzzles):
+    start = perf_counter()
+    for seed, puzzle in enumerate(puzzles):
+        sudoku = cls(seed=seed)
+        sudoku.grid = Grid(puzzle)
+        assert sudoku.solve_grid()
+    return perf_counter() - start
+
+
+def report(label, baseline, bitmask):
+    print('{:<28} list-scan {:8.3f}s   bitmask {:8.3f}s   speedup x{:.2f}'.format(
+        label, baseline, bitmask, baseline / bitmask))
+
+
+if __name__ == '__main__':
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    report('generate_grid x{}'.format(rounds),
+           time_generation(ListScanSudoku, rounds), time_generation(Sudoku, rounds))
+    puzzles = make_puzzles(rounds, 30)
+    report('solve_grid (30 clues) x{}'.format(rounds),
+           time_solving(ListScanSudoku, puzzles), time_solving(Sudoku, puzzles))
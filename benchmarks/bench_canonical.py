@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Measures canonical_form() per puzzle and checks that random symmetry variants
+of a puzzle all map to the same form.
+
+Usage: python benchmarks/bench_canonical.py [puzzles_per_difficulty] [variants]
+"""
+
+import os
+import sys
+from random import Random
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sudoku_engine import canonical_form, generate_many  # noqa: E402
+from sudoku_engine.bank import DIFFICULTIES  # noqa: E402
+from sudoku_engine.symmetry import Transform  # noqa: E402
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    variants = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    rng = Random(2019)
+
+    for difficulty in DIFFICULTIES:
+        puzzles = [unsolved for _, unsolved in generate_many(difficulty, count, workers=1, seed=2019)]
+        timings = []
+        forms = set()
+        for puzzle in puzzles:
+            start = perf_counter()
+            form = canonical_form(puzzle)
+            timings.append(perf_counter() - start)
+            forms.add(form)
+            for _ in range(variants):
+                assert canonical_form(Transform.random(rng).apply(puzzle)) == form
+        timings.sort()
+        print('{:<8} {:>6.2f} ms mean  {:>6.2f} ms max  {:>8.1f} puzzles/s  {} classes'.format(
+            difficulty, sum(timings) / len(timings) * 1000, timings[-1] * 1000, len(timings) / sum(timings),
+            len(forms)))
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Times the bookkeeping of one move: the scans SudokuWindow used to make over
+its fields (digits of the selected area, the win check, the list lookups of
+the givens and hints), replayed on plain lists, against sudoku_engine.game.Game.
+
+Usage: python benchmarks/bench_game.py [moves]
+"""
+
+import os
+import sys
+from timeit import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sudoku_engine.game import Game  # noqa: E402
+from sudoku_engine.generator import generate_puzzle  # noqa: E402
+from sudoku_engine.tables import AREA  # noqa: E402
+
+
+class ScanningBoard:
+    """
+    Stand-in for the window state before the model: texts of the fields and lists of cell IDs.
+    """
+
+    def __init__(self, solved, unsolved):
+        self.solved = list(solved)
+        self.unsolved = list(unsolved)
+        self.texts = [str(value) if value else '' for value in unsolved]
+        self.unsolved_cast = [cell for cell in range(81) if unsolved[cell]]
+        self.hint_filled_ids = []
+
+    def move(self, cell, digit):
+        restricted = set([int(self.texts[num]) for num in AREA[cell] if self.texts[num]])
+        if digit not in restricted and cell not in self.unsolved_cast:
+            self.texts[cell] = str(digit)
+            self.unsolved[cell] = digit
+            # the win check and a highlight pass over all fields
+            all(self.unsolved[x] == self.solved[x] for x in range(81))
+            [x in self.hint_filled_ids or x in self.unsolved_cast for x in range(81)]
+            self.texts[cell] = ''
+            self.unsolved[cell] = 0
+
+
+def game_move(game, cell, digit):
+    if game.can_place(cell, digit) and not game.is_given(cell):
+        game.set(cell, digit)
+        game.won
+        game.undo()
+
+
+if __name__ == '__main__':
+    moves = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    solved, unsolved = generate_puzzle('medium', seed=2019)
+    cells = [cell for cell in range(81) if not unsolved[cell]]
+    plan = [(cells[index % len(cells)], solved[cells[index % len(cells)]]) for index in range(moves)]
+
+    board = ScanningBoard(solved, unsolved)
+    game = Game(solved, unsolved)
+    scanning = timeit(lambda: [board.move(cell, digit) for cell, digit in plan], number=1) / moves * 1e6
+    model = timeit(lambda: [game_move(game, cell, digit) for cell, digit in plan], number=1) / moves * 1e6
+    assert list(game.cells) == list(unsolved)
+    print('widget scans {:8.2f} us   game model {:8.2f} us   per move  (x{:.1f})'.format(
+        scanning, model, scanning / model))
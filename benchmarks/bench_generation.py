@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Reproducible benchmark of puzzle generation (generate_grid + prepare_grid) per difficulty.
+
+Reports p50/p95/p99 latency, retries (failed remove_values attempts) and
+solver calls per puzzle and puzzles/sec. Every puzzle has its own generator
+seed, so two runs on the same commit generate the same puzzles.
+
+Usage: python benchmarks/bench_generation.py [-n COUNT] [--seed SEED] [--json FILE] [--compare FILE]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sudoku_engine.generator import Sudoku  # noqa: E402
+
+DIFFICULTIES = ('easy', 'medium', 'hard')
+
+
+def percentile(values, q):
+    """
+    Nearest-rank percentile of a non-empty list.
+    """
+    ordered = sorted(values)
+    rank = max(1, -(-q * len(ordered) // 100))
+    return ordered[rank - 1]
+
+
+def generate_one(difficulty, seed):
+    sudoku = Sudoku(seed=seed)
+    start = perf_counter()
+    sudoku.generate_grid()
+    sudoku.prepare_grid(difficulty)
+    return perf_counter() - start, sudoku.attempts - 1, sudoku.solver_calls
+
+
+def run_difficulty(difficulty, count, seed):
+    latencies, retries, solver_calls = [], [], []
+    start = perf_counter()
+    for index in range(count):
+        latency, retry_count, calls = generate_one(difficulty, seed + index)
+        latencies.append(latency)
+        retries.append(retry_count)
+        solver_calls.append(calls)
+    elapsed = perf_counter() - start
+
+    return {
+        'puzzles': count,
+        'puzzles_per_second': count / elapsed,
+        'latency_p50_ms': percentile(latencies, 50) * 1000,
+        'latency_p95_ms': percentile(latencies, 95) * 1000,
+        'latency_p99_ms': percentile(latencies, 99) * 1000,
+        'latency_max_ms': max(latencies) * 1000,
+        'retries_per_puzzle': sum(retries) / count,
+        'retries_max': max(retries),
+        'solver_calls_per_puzzle': sum(solver_calls) / count,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL, universal_newlines=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(results, reference=None):
+    columns = ('puzzles_per_second', 'latency_p50_ms', 'latency_p95_ms', 'latency_p99_ms',
+               'retries_per_puzzle', 'solver_calls_per_puzzle')
+    print('{:<8}'.format('') + ''.join('{:>20}'.format(column.replace('_per_', '/').replace('latency_', ''))
+                                       for column in columns))
+    for difficulty, stats in results.items():
+        row = '{:<8}'.format(difficulty)
+        for column in columns:
+            cell = '{:.2f}'.format(stats[column])
+            if reference and difficulty in reference:
+                cell += ' ({:+.0%})'.format(stats[column] / reference[difficulty][column] - 1
+                                            if reference[difficulty][column] else 0)
+            row += '{:>20}'.format(cell)
+        print(row)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('-n', '--count', type=int, default=50, help='puzzles per difficulty')
+    parser.add_argument('--seed', type=int, default=2019, help='seed of the first puzzle of every difficulty')
+    parser.add_argument('--difficulties', nargs='+', choices=DIFFICULTIES, default=DIFFICULTIES)
+    parser.add_argument('--json', metavar='FILE', help='save the results to compare them across commits')
+    parser.add_argument('--compare', metavar='FILE', help='show the change against a previously saved run')
+    args = parser.parse_args()
+
+    results = {difficulty: run_difficulty(difficulty, args.count, args.seed) for difficulty in args.difficulties}
+
+    reference = None
+    if args.compare:
+        with open(args.compare) as file:
+            reference = json.load(file)['results']
+    print_table(results, reference)
+
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump({
+                'revision': git_revision(),
+                'python': platform.python_version(),
+                'seed': args.seed,
+                'count': args.count,
+                'results': results,
+            }, file, indent=2)
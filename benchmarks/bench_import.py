@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Guards the headless import cost of the engine: every module below is imported
+in a fresh interpreter, must not pull in PyQt5 and must stay within its
+budget (best of several runs, cumulative time reported by -X importtime).
+
+Usage: python benchmarks/bench_import.py [runs]
+Exits with status 1 when a module goes over budget or imports PyQt5.
+"""
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# module -> budget in milliseconds
+BUDGETS = {
+    'sudoku_engine': 10,
+    'sudoku_engine.search': 30,
+    'sudoku_engine.generator': 40,
+    'sudoku_engine.cli': 150,
+}
+CHECK = "import sys, {0}; sys.exit(any(name.split('.')[0] == 'PyQt5' for name in sys.modules))"
+
+
+def import_time(module):
+    """
+    :return: (cumulative import time in ms, whether PyQt5 got imported)
+    """
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', CHECK.format(module)],
+                             cwd=ROOT, stderr=subprocess.PIPE, universal_newlines=True)
+    for line in reversed(process.stderr.splitlines()):
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1]) / 1000, process.returncode != 0
+    raise RuntimeError('Could not import {}:\n{}'.format(module, process.stderr))
+
+
+if __name__ == '__main__':
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    failed = False
+    for module, budget in BUDGETS.items():
+        timings = [import_time(module) for _ in range(runs)]
+        best = min(milliseconds for milliseconds, _ in timings)
+        qt_imported = any(qt for _, qt in timings)
+        status = 'ok'
+        if qt_imported:
+            status = 'IMPORTS PyQt5'
+        elif best > budget:
+            status = 'OVER BUDGET'
+        failed = failed or status != 'ok'
+        print('{:<28}{:>9.1f} ms  (budget {:>4} ms)  {}'.format(module, best, budget, status))
+
+    try:
+        reference = min(import_time('PyQt5.QtWidgets')[0] for _ in range(runs))
+        print('{:<28}{:>9.1f} ms  (for reference)'.format('PyQt5.QtWidgets', reference))
+    except RuntimeError:
+        pass
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Compares fresh generation with symmetry multiplication, in puzzles/sec.
+
+Every variant is checked to keep a single solution and the exact rating of its
+base puzzle; the hardest techniques of the base puzzles are listed, so a run
+shows whether it covered the eliminating techniques or only singles.
+
+Usage: python benchmarks/bench_multiply.py [difficulty] [base_puzzles] [multiply] [band]
+"""
+
+import os
+import sys
+from collections import Counter
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sudoku_engine import count_solutions, generate_many, rate  # noqa: E402
+
+if __name__ == '__main__':
+    difficulty = sys.argv[1] if len(sys.argv) > 1 else 'medium'
+    bases = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    multiply = int(sys.argv[3]) if len(sys.argv) > 3 else 1000
+    band = sys.argv[4] if len(sys.argv) > 4 else None
+
+    start = perf_counter()
+    fresh = list(generate_many(difficulty, bases, workers=1, band=band, seed=2019))
+    fresh_rate = bases / (perf_counter() - start)
+
+    start = perf_counter()
+    multiplied = list(generate_many(difficulty, bases * multiply, workers=1, band=band, seed=2019,
+                                    multiply=multiply))
+    multiplied_rate = len(multiplied) / (perf_counter() - start)
+
+    hardest = Counter()
+    for index in range(0, len(multiplied), multiply):
+        rating = rate(multiplied[index][1])
+        hardest[rating.hardest] += 1
+        for solved, unsolved in multiplied[index:index + multiply]:
+            assert count_solutions(unsolved) == 1 and rate(unsolved) == rating
+    assert len({tuple(unsolved) for _, unsolved in multiplied}) == len(multiplied)
+
+    print('fresh       {:>8} puzzles  {:12.1f} puzzles/s'.format(bases, fresh_rate))
+    print('multiplied  {:>8} puzzles  {:12.1f} puzzles/s  speedup x{:.0f}'.format(
+        len(multiplied), multiplied_rate, multiplied_rate / fresh_rate))
+    print('hardest technique of the base puzzles: ' + ', '.join(
+        '{} x{}'.format(name, count) for name, count in hardest.most_common()))
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Load test of the puzzle service: starts `python -m sudoku_engine serve` on a
+free port, sends requests from several pipelining connections and reports the
+throughput and the latency percentiles per operation.
+
+The traffic is 80% solve (drawn from a pool of distinct puzzles, so repeats hit
+the cache), 10% rate and 10% generate of a random difficulty.
+
+Usage: python benchmarks/bench_service.py [requests] [connections] [window] [distinct_puzzles]
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from random import Random
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sudoku_engine import generate_many  # noqa: E402
+from sudoku_engine.puzzle_io import format_line  # noqa: E402
+
+OPS = ['solve'] * 8 + ['rate', 'generate']
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+async def connection(host, port, requests, window, latencies, errors):
+    """
+    Sends requests keeping `window` of them unanswered at most, and records their latencies by op.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    sent = {}  # id -> (op, send time)
+    slots = asyncio.Semaphore(window)
+
+    async def receive():
+        for _ in requests:
+            response = json.loads(await reader.readline())
+            op, start = sent.pop(response['id'])
+            latencies[op].append(perf_counter() - start)
+            if 'error' in response:
+                errors[op] += 1
+            slots.release()
+
+    receiver = asyncio.ensure_future(receive())
+    for request in requests:
+        await slots.acquire()
+        sent[request['id']] = request['op'], perf_counter()
+        writer.write((json.dumps(request) + '\n').encode())
+        await writer.drain()
+    await receiver
+    writer.close()
+
+
+async def query(host, port, request):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write((json.dumps(request) + '\n').encode())
+    response = json.loads(await reader.readline())
+    writer.close()
+    return response
+
+
+async def main(total, connections, window, distinct):
+    pool = [format_line(unsolved) for _, unsolved in generate_many('medium', distinct, workers=1, seed=2019)]
+    rng = Random(2019)
+    requests = []
+    for request_id in range(total):
+        op = rng.choice(OPS)
+        request = {'id': request_id, 'op': op}
+        if op == 'generate':
+            request['difficulty'] = rng.choice(['easy', 'medium', 'hard'])
+        else:
+            request['grid'] = rng.choice(pool)
+        requests.append(request)
+
+    server = subprocess.Popen([sys.executable, '-m', 'sudoku_engine', 'serve', '--port', '0'], cwd=ROOT,
+                              stderr=subprocess.PIPE, universal_newlines=True)
+    try:
+        host, port = server.stderr.readline().split()[-1].rsplit(':', 1)
+        await asyncio.sleep(1.0)  # let the warm queues fill up a little
+
+        latencies = defaultdict(list)
+        errors = defaultdict(int)
+        start = perf_counter()
+        await asyncio.gather(*(connection(host, port, requests[index::connections], window, latencies, errors)
+                               for index in range(connections)))
+        elapsed = perf_counter() - start
+        stats = await query(host, port, {'op': 'stats'})
+    finally:
+        server.terminate()
+        server.wait()
+
+    print('{} requests over {} connections (window {}): {:.1f} requests/s'.format(
+        total, connections, window, total / elapsed))
+    print('{:<10}{:>8}{:>8}{:>10}{:>10}{:>10}{:>10}'.format('op', 'count', 'errors', 'p50 ms', 'p90 ms', 'p99 ms', 'max ms'))
+    for op in sorted(latencies):
+        values = sorted(latencies[op])
+        print('{:<10}{:>8}{:>8}{:>10.2f}{:>10.2f}{:>10.2f}{:>10.2f}'.format(
+            op, len(values), errors[op], *(1000 * percentile(values, fraction) for fraction in (0.5, 0.9, 0.99, 1.0))))
+    print('mean batch {:.1f}, solve cache hit rate {:.1%}, generate requests waiting for the generator: {}'.format(
+        stats['mean_batch'], stats['cache']['hit_rate'], stats.get('warm_misses', 0)))
+
+
+if __name__ == '__main__':
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    connections = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    window = int(sys.argv[3]) if len(sys.argv) > 3 else 16
+    distinct = int(sys.argv[4]) if len(sys.argv) > 4 else 200
+    asyncio.run(main(total, connections, window, distinct))
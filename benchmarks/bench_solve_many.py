@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Measures how solve_many scales with the number of worker processes.
+
+Usage: python benchmarks/bench_solve_many.py [puzzles] [max_workers]
+"""
+
+import os
+import sys
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_backends import HARDEST, parse  # noqa: E402
+from sudoku_engine import solve_many  # noqa: E402
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    grids = [parse(line) for line in HARDEST.values()] * (count // len(HARDEST))
+
+    baseline = None
+    steps = sorted({2**power for power in range(max_workers.bit_length())} | {max_workers})
+    for workers in steps:
+        start = perf_counter()
+        failures = sum(1 for result in solve_many(grids, workers=workers) if result.error)
+        elapsed = perf_counter() - start
+        baseline = baseline or elapsed
+        assert not failures
+        print('workers {:>3}: {:8.3f}s  {:8.1f} puzzles/s  speedup x{:.2f}'.format(
+            workers, elapsed, len(grids) / elapsed, baseline / elapsed))
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Shows what the precomputed tables of sudoku_engine.tables save: the solvers are
+timed once with the tables and once with the peers worked out from the cell
+ID on every lookup, the way the code did it before, and the GUI's selection
+area is timed both ways.
+
+Usage: python benchmarks/bench_tables.py [puzzles]
+"""
+
+import os
+import sys
+from timeit import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sudoku_engine import generate_many  # noqa: E402
+from sudoku_engine import logic, mrv, tables  # noqa: E402
+
+
+class ArithmeticPeers:
+    """
+    Stand-in for tables.PEERS that computes the peers of a cell on every lookup.
+    """
+
+    def __getitem__(self, cell):
+        row, col = cell // 9, cell % 9
+        box = cell // 27 * 27 + col // 3 * 3
+        area = set(range(row * 9, row * 9 + 9)) | set(range(col, 81, 9)) \
+            | {box + x + y * 9 for y in range(3) for x in range(3)}
+        area.discard(cell)
+        return tuple(area)
+
+
+def arithmetic_area(field_id):
+    # SudokuWindow.update_current_area before the tables
+    current_row = [x for x in range(field_id - field_id % 9, field_id // 9 * 9 + 9)]
+    current_col = [x * 9 + field_id % 9 for x in range(9)]
+    current_box = [range(81)[field_id // 27 * 27 + field_id % 9 // 3 * 3 + x + y * 9] for y in range(3) for x in range(3)]
+    return set(current_row + current_col + current_box)
+
+
+def time_solvers(puzzles, rounds):
+    """
+    :return: {solver name: microseconds per solve}
+    """
+    solvers = {
+        'mrv': lambda: [mrv.solve(puzzle) for puzzle in puzzles],
+        'logic': lambda: [logic.logic_solve(puzzle) for puzzle in puzzles],
+    }
+    return {name: timeit(run, number=rounds) / rounds / len(puzzles) * 1e6 for name, run in solvers.items()}
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    rounds = 5
+    puzzles = [unsolved for _, unsolved in generate_many('hard', count, workers=1, seed=2019)]
+
+    with_tables = time_solvers(puzzles, rounds)
+    mrv.PEERS = logic.PEERS = ArithmeticPeers()
+    try:
+        without_tables = time_solvers(puzzles, rounds)
+    finally:
+        mrv.PEERS = logic.PEERS = tables.PEERS
+
+    for name in with_tables:
+        print('{:<22} arithmetic {:8.1f} us   tables {:8.1f} us   saved {:6.1f} us per solve'.format(
+            name + ' solve', without_tables[name], with_tables[name], without_tables[name] - with_tables[name]))
+
+    assert all(arithmetic_area(cell) == tables.AREA[cell] for cell in range(81))
+    lookups = 100000
+    arithmetic = timeit(lambda: arithmetic_area(40), number=lookups) / lookups * 1e6
+    table = timeit(lambda: tables.AREA[40], number=lookups) / lookups * 1e6
+    print('{:<22} arithmetic {:8.2f} us   tables {:8.2f} us   saved {:6.2f} us per click'.format(
+        'GUI selection area', arithmetic, table, arithmetic - table))
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Compares solve_many() with and without the NumPy singles pass, in one process.
+
+Usage: python benchmarks/bench_vectorized.py [puzzles_per_difficulty] [chunksize]
+"""
+
+import os
+import sys
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sudoku_engine import generate_many, solve_many  # noqa: E402
+from sudoku_engine.bank import DIFFICULTIES  # noqa: E402
+from sudoku_engine.vectorized import as_board, propagate  # noqa: E402
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    chunksize = int(sys.argv[2]) if len(sys.argv) > 2 else 1024
+
+    for difficulty in DIFFICULTIES:
+        # symmetry variants keep the generation short, they are as hard to solve as their base puzzles
+        puzzles = list(generate_many(difficulty, count, workers=1, seed=2019, multiply=100))
+        grids = [unsolved for _, unsolved in puzzles]
+        _, solved, _ = propagate(as_board(grids))
+
+        timings = {}
+        for vectorized in (False, True):
+            start = perf_counter()
+            results = list(solve_many(grids, workers=1, chunksize=chunksize, vectorized=vectorized))
+            timings[vectorized] = perf_counter() - start
+            assert [result.solution for result in results] == [solution for solution, _ in puzzles]
+        print('{:<8} singles only {:5.1f}%   mrv {:8.1f} puzzles/s   vectorized {:8.1f} puzzles/s   speedup x{:.2f}'.format(
+            difficulty, 100 * solved.mean(), count / timings[False], count / timings[True],
+            timings[False] / timings[True]))
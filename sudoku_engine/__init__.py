@@ -0,0 +1,62 @@
+"""
+Sudoku engine: candidate bookkeeping, solving and puzzle generation helpers
+shared by the GUI (Sudoku.py) and the standalone solver (sudoku_solver.py).
+
+The package never imports PyQt5. Its public names are loaded on first access,
+so `import sudoku_engine` stays cheap for worker processes and the command
+line, e.g. the process pool machinery is only imported with solve_many.
+NumPy is optional and only needed by sudoku_engine.vectorized.
+"""
+
+from importlib import import_module
+
+_EXPORTS = {
+    'BACKENDS': 'sudoku_engine.search',
+    'CandidateMasks': 'sudoku_engine.candidates',
+    'DedupIndex': 'sudoku_engine.canonical',
+    'Game': 'sudoku_engine.game',
+    'GenerationResult': 'sudoku_engine.generator',
+    'GenerationTimeout': 'sudoku_engine.generator',
+    'Grid': 'sudoku_engine.grid',
+    'LRUCache': 'sudoku_engine.cache',
+    'PuzzleService': 'sudoku_engine.service',
+    'Rating': 'sudoku_engine.rating',
+    'SolveResult': 'sudoku_engine.batch',
+    'Transform': 'sudoku_engine.symmetry',
+    'Sudoku': 'sudoku_engine.generator',
+    'cached_count_solutions': 'sudoku_engine.cache',
+    'cached_solve': 'sudoku_engine.cache',
+    'canonical_form': 'sudoku_engine.canonical',
+    'count_solutions': 'sudoku_engine.search',
+    'generate': 'sudoku_engine.generator',
+    'generate_many': 'sudoku_engine.batch',
+    'generate_puzzle': 'sudoku_engine.generator',
+    'generate_puzzles': 'sudoku_engine.generator',
+    'iter_solutions': 'sudoku_engine.search',
+    'multiply_puzzle': 'sudoku_engine.symmetry',
+    'puzzle_from_id': 'sudoku_engine.generator',
+    'puzzle_id': 'sudoku_engine.generator',
+    'rate': 'sudoku_engine.rating',
+    'read_puzzles': 'sudoku_engine.puzzle_io',
+    'solve': 'sudoku_engine.search',
+    'solve_batch': 'sudoku_engine.vectorized',
+    'solve_file': 'sudoku_engine.batch',
+    'solve_job': 'sudoku_engine.batch',
+    'solve_many': 'sudoku_engine.batch',
+    'start_trace': 'sudoku_engine.batch',
+    'write_puzzles': 'sudoku_engine.puzzle_io',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+    value = getattr(import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,159 @@
+"""
+Stock of ready-made puzzles, indexed by difficulty and kept in a compact file,
+so that a new game never has to wait for the generator.
+
+File layout: the MAGIC header followed by RECORD_SIZE-byte records, each made of
+the difficulty index, the solution packed two digits per byte and a bitmap of
+the cells given to the player.
+"""
+
+import os
+import threading
+
+MAGIC = b'SDKBANK1'
+DIFFICULTIES = ('easy', 'medium', 'hard')
+SOLUTION_SIZE = 41  # 81 digits, 4 bits each
+GIVENS_SIZE = 11  # 81 bits
+RECORD_SIZE = 1 + SOLUTION_SIZE + GIVENS_SIZE
+
+
+def pack_puzzle(solved, unsolved):
+    """
+    :param solved: Flat list of the 81 digits of the solution.
+    :param unsolved: Flat list of the 81 cells shown to the player (0 for a blank).
+    :return: SOLUTION_SIZE + GIVENS_SIZE bytes describing the puzzle.
+    """
+    digits = list(solved) + [0]
+    solution = bytes(digits[i] << 4 | digits[i+1] for i in range(0, 82, 2))
+    givens = sum(1 << cell for cell in range(81) if unsolved[cell])
+    return solution + givens.to_bytes(GIVENS_SIZE, 'little')
+
+
+def unpack_puzzle(data):
+    """
+    :return: (solved, unsolved) flat lists of the puzzle packed by pack_puzzle().
+    """
+    solved = []
+    for byte in data[:SOLUTION_SIZE]:
+        solved.append(byte >> 4)
+        solved.append(byte & 0xF)
+    del solved[81:]
+    givens = int.from_bytes(data[SOLUTION_SIZE:SOLUTION_SIZE+GIVENS_SIZE], 'little')
+    unsolved = [solved[cell] if givens >> cell & 1 else 0 for cell in range(81)]
+    return solved, unsolved
+
+
+class PuzzleBank:
+    """
+    Difficulty-indexed puzzle stock with an optional background thread topping it up.
+    """
+
+    def __init__(self, path, generate, capacity=10, low_water=3):
+        """
+        :param path: File the stock is loaded from and saved to.
+        :param generate: Callable taking a difficulty and returning (solved, unsolved) flat grids.
+        :param capacity: Number of puzzles kept in stock for every difficulty.
+        :param low_water: Stock size below which the refill worker is woken up.
+        """
+        self.path = path
+        self.generate = generate
+        self.capacity = capacity
+        self.low_water = low_water
+        self.stock = {difficulty: [] for difficulty in DIFFICULTIES}
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._worker = None
+        self.load()
+
+    def load(self):
+        """
+        Reads the stock from the bank file. A missing or foreign file leaves the bank empty.
+        """
+        try:
+            with open(self.path, 'rb') as file:
+                data = file.read()
+        except OSError:
+            return
+        if not data.startswith(MAGIC):
+            return
+
+        with self._lock:
+            for offset in range(len(MAGIC), len(data) - RECORD_SIZE + 1, RECORD_SIZE):
+                index = data[offset]
+                if index < len(DIFFICULTIES):
+                    self.stock[DIFFICULTIES[index]].append(data[offset+1: offset+RECORD_SIZE])
+
+    def save(self):
+        """
+        Writes the stock to the bank file, replacing it atomically.
+        The lock is held until the file is replaced: take() on the GUI thread and the refill
+        worker both save, and would otherwise write and rename the same temporary file.
+        """
+        with self._lock:
+            records = [bytes([DIFFICULTIES.index(difficulty)]) + puzzle
+                       for difficulty, puzzles in self.stock.items() for puzzle in puzzles]
+            temporary = self.path + '.tmp'
+            with open(temporary, 'wb') as file:
+                file.write(MAGIC + b''.join(records))
+            os.replace(temporary, self.path)
+
+    def count(self, difficulty):
+        return len(self.stock[difficulty])
+
+    def put(self, difficulty, solved, unsolved):
+        with self._lock:
+            self.stock[difficulty].append(pack_puzzle(solved, unsolved))
+
+    def take(self, difficulty='easy'):
+        """
+        Removes a puzzle from the stock and wakes the refill worker if the stock runs low.
+        :return: (solved, unsolved) flat grids, or None when there is no puzzle of this difficulty.
+        """
+        with self._lock:
+            puzzles = self.stock[difficulty]
+            puzzle = puzzles.pop(0) if puzzles else None
+            running_low = len(puzzles) < self.low_water
+        if running_low:
+            self._wake.set()
+        if puzzle is None:
+            return None
+        self.save()
+        return unpack_puzzle(puzzle)
+
+    def start_refill(self):
+        """
+        Starts the daemon thread generating puzzles until every difficulty is stocked to capacity.
+        """
+        if self._worker is None:
+            self._stopping = False
+            self._worker = threading.Thread(target=self._refill, name='puzzle-bank-refill', daemon=True)
+            self._worker.start()
+        self._wake.set()
+
+    def stop(self, timeout=None):
+        """
+        Asks the refill worker to finish once the puzzle it is working on is done.
+        """
+        self._stopping = True
+        self._wake.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+            self._worker = None
+
+    def refill(self):
+        """
+        Generates puzzles until every difficulty is stocked to capacity (or stop() is called).
+        """
+        for difficulty in DIFFICULTIES:
+            while self.count(difficulty) < self.capacity and not self._stopping:
+                solved, unsolved = self.generate(difficulty)
+                self.put(difficulty, solved, unsolved)
+                self.save()
+
+    def _refill(self):
+        while not self._stopping:
+            self._wake.wait()
+            self._wake.clear()
+            self.refill()
@@ -0,0 +1,293 @@
+"""
+Solving and generating many grids at once over a pool of worker processes.
+"""
+
+import os
+import threading
+from collections import deque, namedtuple
+from itertools import chain, count as counter, islice, repeat
+from multiprocessing import Pool
+
+from sudoku_engine import stats
+from sudoku_engine.cache import NO_SOLUTION, solution_key
+from sudoku_engine.canonical import canonical_key
+from sudoku_engine.generator import generate_puzzle
+from sudoku_engine.puzzle_io import read_puzzles, write_puzzles
+from sudoku_engine.search import solve
+from sudoku_engine.symmetry import multiply_puzzle
+
+# index - position of the grid in the input, solution - solved grid in the shape of the input
+# (None on failure), error - None on success, otherwise a message explaining the failure
+SolveResult = namedtuple('SolveResult', ['index', 'solution', 'error'])
+NO_SOLUTION_ERROR = 'Solution does not exist.'
+# written in place of the solution of a puzzle that failed, so output line N stays puzzle N
+FAILED_LINE = '.' * 81
+
+
+def _to_job(index, grid, backend):
+    """
+    Flattens a grid into the compact form sent to the workers.
+    Grids that cannot be flattened are passed on as they are, to be reported by the worker.
+    """
+    try:
+        if len(grid) == 9:
+            return index, bytes(chain.from_iterable(grid)), True, backend
+        return index, bytes(grid), False, backend
+    except (TypeError, ValueError):
+        return index, grid, False, backend
+
+
+def solve_job(job):
+    """
+    Solves one grid in a worker process, also used by the workers of sudoku_engine.service.
+    :param job: (index, cells, nested, backend) tuple: the 81 cells as bytes (or the ValueError of a malformed
+        line), whether the solution is wanted as 9 rows and the search backend.
+    :return: SolveResult.
+    """
+    index, cells, nested, backend = job
+    if isinstance(cells, ValueError):  # malformed line, see read_puzzles(malformed='keep')
+        return SolveResult(index, None, str(cells))
+    try:
+        if not isinstance(cells, bytes) or len(cells) != 81 or max(cells) > 9:
+            return SolveResult(index, None, 'Invalid grid: expected 81 cells holding digits 0-9.')
+        solution = solve(cells, backend)
+    except Exception as error:  # a failing grid must not take the whole batch down
+        return SolveResult(index, None, '{}: {}'.format(type(error).__name__, error))
+
+    if solution is None:
+        return SolveResult(index, None, NO_SOLUTION_ERROR)
+    return _solved(index, solution, nested)
+
+
+def _solved(index, solution, nested):
+    if nested:
+        solution = [solution[row*9: row*9+9] for row in range(9)]
+    return SolveResult(index, solution, None)
+
+
+def _solve_chunk(jobs):
+    """
+    Solves a list of jobs with sudoku_engine.vectorized, the grids it cannot finish go through solve_job().
+    """
+    # NumPy is only imported by the workers of a vectorized run
+    from sudoku_engine.vectorized import as_board, propagate
+
+    valid = [job for job in jobs if isinstance(job[1], bytes) and len(job[1]) == 81 and max(job[1]) <= 9]
+    board, solved, failed = propagate(as_board([job[1] for job in valid]))
+    results = {}
+    for (index, cells, nested, backend), grid, done, dead in zip(valid, board.tolist(), solved, failed):
+        if done:
+            results[index] = _solved(index, grid, nested)
+        elif not dead:
+            # the search picks up where the propagation stopped, failures keep the original grid for the report
+            results[index] = solve_job((index, bytes(grid), nested, backend))
+    return [results.get(job[0]) or solve_job(job) for job in jobs]
+
+
+def _chunks(jobs, size):
+    jobs = iter(jobs)
+    while True:
+        chunk = list(islice(jobs, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _throttled(jobs, slots, closed):
+    """
+    Hands out jobs only while there are free slots, so the pool never reads far ahead of the consumer.
+    """
+    for job in jobs:
+        while not slots.acquire(timeout=0.1):
+            if closed.is_set():
+                return
+        yield job
+
+
+def start_trace(path):
+    """
+    Initializer of worker processes appending their stats events to the file at `path`, as JSON lines.
+    """
+    stats.add_sink(stats.JsonLinesSink(path))
+
+
+def _imap(function, jobs, workers, chunksize, ordered, trace=None):
+    """
+    Maps function over jobs in a process pool, reading ahead of the consumer by a bounded amount only.
+    :param trace: Optional path of a file the workers append their stats events to, as JSON lines.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        if trace is None:
+            yield from map(function, jobs)
+            return
+        sink = stats.JsonLinesSink(trace)
+        try:
+            with stats.recording(sink):
+                yield from map(function, jobs)
+        finally:
+            sink.close()
+        return
+
+    # Pool.imap would otherwise pull the whole input into its task queue at once
+    slots = threading.Semaphore(4 * workers * chunksize)
+    closed = threading.Event()
+    with Pool(workers, start_trace if trace else None, (trace,)) as pool:
+        mapper = pool.imap if ordered else pool.imap_unordered
+        try:
+            for result in mapper(function, _throttled(jobs, slots, closed), chunksize):
+                slots.release()
+                yield result
+        finally:
+            closed.set()
+
+
+def solve_many(grids, workers=None, chunksize=64, ordered=True, backend='mrv', vectorized=False, trace=None,
+               cache=None):
+    """
+    Solves grids in parallel, yielding one SolveResult per input grid.
+    Failures (invalid or unsolvable grids) are reported in SolveResult.error instead of being raised.
+    :param grids: Iterable of grids, each either a flat list of 81 values or 9 rows of 9 values (0 for a blank).
+    :param workers: Number of worker processes, os.cpu_count() by default. With 1 the grids are solved in this process.
+    :param chunksize: Number of grids sent to a worker at once, bigger chunks cut down the inter-process traffic.
+    :param ordered: Yield the results in input order, otherwise as soon as they are ready.
+    :param backend: Search algorithm, see sudoku_engine.search.BACKENDS.
+    :param vectorized: Fill in the singles of every chunk with NumPy (see sudoku_engine.vectorized) and
+        search only the grids left unfinished. Pays off for easy grids and big chunks.
+    :param trace: Optional path of a file to append the stats events of the solvers to, as JSON lines
+        (see sudoku_engine.stats).
+    :param cache: Optional sudoku_engine.cache.LRUCache. Grids solved before are answered from it without
+        reaching a worker, the solutions of the others are added to it.
+    :return: Generator of SolveResult.
+    """
+    jobs = (_to_job(index, grid, backend) for index, grid in enumerate(grids))
+
+    def solve_jobs(jobs):
+        if vectorized:
+            return chain.from_iterable(_imap(_solve_chunk, _chunks(jobs, chunksize), workers, 1, ordered, trace))
+        return _imap(solve_job, jobs, workers, chunksize, ordered, trace)
+
+    if cache is not None:
+        return _through_cache(jobs, cache, solve_jobs, ordered)
+    return solve_jobs(jobs)
+
+
+def _through_cache(jobs, cache, solve_jobs, ordered):
+    """
+    Answers the jobs found in the cache and hands the others to solve_jobs, caching their results.
+    In order, every cached result waits for the results of the jobs before it.
+    """
+    ready = deque()  # results of the cache hits, in input order
+    pending = {}  # index -> (cache key, nested) of the jobs passed on
+    # the jobs are read by the thread feeding the pool, while the results are cached by this one
+    lock = threading.Lock()
+
+    def misses():
+        for job in jobs:
+            index, cells, nested, _ = job
+            if not isinstance(cells, bytes) or len(cells) != 81:
+                yield job  # invalid, left to the worker to report
+                continue
+            key = solution_key(cells)
+            with lock:
+                value = cache.get(key)
+            if value is None:
+                pending[index] = key, nested
+                yield job
+            elif value == NO_SOLUTION:
+                ready.append(SolveResult(index, None, NO_SOLUTION_ERROR))
+            else:
+                ready.append(_solved(index, list(value), nested))
+
+    for result in solve_jobs(misses()):
+        while ready and (not ordered or ready[0].index < result.index):
+            yield ready.popleft()
+        key, nested = pending.pop(result.index, (None, False))
+        if key is not None and (result.solution is not None or result.error == NO_SOLUTION_ERROR):
+            if result.solution is None:
+                value = NO_SOLUTION
+            else:
+                value = bytes(chain.from_iterable(result.solution) if nested else result.solution)
+            with lock:
+                cache.put(key, value)
+        yield result
+    yield from ready
+
+
+def _generate_job(job):
+    difficulty, band, seed = job
+    return generate_puzzle(difficulty, band, seed)
+
+
+def _generate_keyed_job(job):
+    solved, unsolved = _generate_job(job)
+    return solved, unsolved, canonical_key(unsolved)
+
+
+def generate_many(difficulty='easy', count=None, workers=None, chunksize=1, band=None, seed=None, multiply=1,
+                  dedup=None, trace=None):
+    """
+    Generates puzzles in parallel.
+    :param difficulty: 'easy', 'medium' or 'hard'.
+    :param count: Number of puzzles to generate, endless if None.
+    :param workers: Number of worker processes, os.cpu_count() by default.
+    :param chunksize: Number of puzzles a worker generates before handing them over.
+    :param band: Optional rating band the puzzles have to fall into, see Sudoku.remove_values().
+    :param seed: Seed of the first puzzle, the following ones use seed+1, seed+2... The output then
+        does not depend on the number of workers and comes in order. Without a seed the puzzles are
+        random and yielded as soon as they are ready.
+    :param multiply: Number of games derived from every generated one by symmetry transformations,
+        see sudoku_engine.symmetry. They are as hard as the generated game and cost next to nothing,
+        but come in runs of the same puzzle in disguise.
+    :param dedup: Optional sudoku_engine.canonical.DedupIndex. Puzzles equivalent to one in the index
+        are dropped (and do not count), the others are added to it. The workers compute the keys.
+    :param trace: Optional path of a file to append the stats events of the generator to, as JSON lines
+        (see sudoku_engine.stats).
+    :return: Generator of (solved, unsolved) flat grids.
+    """
+    if multiply < 1:
+        raise ValueError('multiply has to be at least 1, got {}.'.format(multiply))
+    if multiply > 1 and dedup is not None:
+        raise ValueError('The games derived with multiply are equivalent, they cannot be deduplicated.')
+    seeds = repeat(None) if seed is None else counter(seed)
+    if count is not None and dedup is None:
+        seeds = islice(seeds, -(-count // multiply))
+    jobs = ((difficulty, band, job_seed) for job_seed in seeds)
+
+    if dedup is not None:
+        keyed = _imap(_generate_keyed_job, jobs, workers, chunksize, seed is not None, trace)
+        puzzles = ((solved, unsolved) for solved, unsolved, key in keyed if dedup.add_key(key))
+    else:
+        puzzles = _imap(_generate_job, jobs, workers, chunksize, seed is not None, trace)
+    if multiply > 1:
+        # a seeded run yields the games in order, so every one is transformed with its own seed
+        transform_seeds = repeat(None) if seed is None else counter(seed)
+        puzzles = chain.from_iterable(multiply_puzzle(solved, unsolved, multiply, transform_seed)
+                                      for (solved, unsolved), transform_seed in zip(puzzles, transform_seeds))
+    if count is not None and (multiply > 1 or dedup is not None):
+        puzzles = islice(puzzles, count)
+    return puzzles
+
+
+def solve_file(source, target, workers=None, chunksize=64, backend='mrv'):
+    """
+    Streams puzzles from a file through solve_many() into another file, in input order.
+    Puzzles that are malformed or cannot be solved get a FAILED_LINE (81 blanks), so that
+    output line N holds the solution of puzzle N.
+    :param source: Path or text file object with one puzzle per line.
+    :param target: Path or text file object the solutions are written to.
+    :return: (solved, failed) counts.
+    """
+    failed = 0
+
+    def solutions():
+        nonlocal failed
+        for result in solve_many(read_puzzles(source, 'keep'), workers, chunksize, True, backend):
+            if result.error:
+                failed += 1
+                yield [0] * 81
+            else:
+                yield result.solution
+
+    written = write_puzzles(target, solutions())
+    return written - failed, failed
@@ -0,0 +1,154 @@
+"""
+Content-addressed cache of solver results.
+
+Grids are keyed by a 16-byte digest of their cells, so the same puzzle hits
+the cache however it reached the solver (list, tuple, bytes or Grid).
+Uniqueness verdicts can also be keyed by the canonical form of the puzzle
+(see sudoku_engine.canonical), which makes all its symmetry variants share
+one entry. Solutions are always keyed by the exact grid, since they have to
+be returned in the grid's own orientation.
+
+The cache keeps the most recently used entries in memory, up to `maxsize`.
+With a path it also writes every entry through to a dbm file, which is
+consulted on memory misses and survives restarts.
+"""
+
+from collections import OrderedDict
+
+from sudoku_engine.search import count_solutions, solve
+
+KEY_SIZE = 16
+NO_SOLUTION = b''
+
+
+def grid_key(grid):
+    """
+    :return: KEY_SIZE-byte digest of the 81 cells of a flat grid.
+    """
+    # imported here, hashlib loads OpenSSL and the generator only needs LRUCache
+    from hashlib import blake2b
+    return blake2b(bytes(grid), digest_size=KEY_SIZE).digest()
+
+
+class LRUCache:
+    """
+    Bytes-to-bytes mapping holding the `maxsize` most recently used entries in memory,
+    optionally backed by a dbm file.
+    """
+
+    def __init__(self, maxsize=100000, path=None):
+        """
+        :param maxsize: Number of entries kept in memory.
+        :param path: Optional dbm file every entry is written to, opened (or created) here.
+        """
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.disk = None
+        if path is not None:
+            # dbm is only imported by caches kept on disk, the generator's verdict caches stay in memory
+            import dbm
+            self.disk = dbm.open(path, 'c')
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_hits = 0  # hits served from the dbm file, also counted in hits
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """
+        :return: The value stored under the key, or None.
+        """
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+        if self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.hits += 1
+                self.disk_hits += 1
+                self._remember(key, value)
+                return value
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        self._remember(key, value)
+        if self.disk is not None:
+            self.disk[key] = value
+
+    def _remember(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        """
+        :return: Dict of the hit, miss and eviction counts, the size and the hit rate.
+        """
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'disk_hits': self.disk_hits,
+                'size': len(self.entries), 'hit_rate': self.hits / lookups if lookups else 0.0}
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()
+            self.disk = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+
+def solution_key(grid):
+    """
+    :return: Cache key of the solution of a flat grid.
+    """
+    return b's' + grid_key(grid)
+
+
+def cached_solve(grid, cache, backend='mrv'):
+    """
+    solve() through a cache.
+    :param grid: Flat grid of 81 cell values (0 for a blank).
+    :param cache: LRUCache to look the solution up in and to store it to.
+    :return: A solution of the grid as a flat list of 81 digits, or None if there is none.
+    """
+    key = solution_key(grid)
+    value = cache.get(key)
+    if value is None:
+        solution = solve(grid, backend)
+        cache.put(key, NO_SOLUTION if solution is None else bytes(solution))
+        return solution
+    return list(value) if value != NO_SOLUTION else None
+
+
+def cached_count_solutions(grid, cache, limit=2, backend='mrv', canonical=False):
+    """
+    count_solutions() through a cache, e.g. cached_count_solutions(grid, cache) == 1 for a unique solution.
+    :param canonical: Key the verdict by the canonical form of the grid, shared by all its symmetry variants.
+    :return: Number of solutions found, at most `limit`.
+    """
+    if canonical:
+        from sudoku_engine.canonical import canonical_key
+        try:
+            key = canonical_key(grid)
+        except ValueError:  # a digit repeats in a unit, there is no solution to cache
+            return 0
+    else:
+        key = grid_key(grid)
+    key = b'c%d:' % limit + key
+    value = cache.get(key)
+    if value is None:
+        found = count_solutions(grid, limit, backend)
+        cache.put(key, b'%d' % found)
+        return found
+    return int(value)
@@ -0,0 +1,70 @@
+"""
+Bitmask bookkeeping of the digits still free in every row, column and box.
+
+Digit d is stored as bit ``1 << (d - 1)``, so a set of digits fits in 9 bits
+and the candidates of a cell are the AND of its row, column and box masks.
+"""
+
+from sudoku_engine.tables import BOX_OF, COL_OF, ROW_OF
+
+ALL_DIGITS = 0x1FF
+
+# BIT[d] is the mask of digit d (BIT[0] is the empty mask, so blanks are no-ops)
+BIT = (0,) + tuple(1 << (digit - 1) for digit in range(1, 9+1))
+# number of digits and the sorted digits contained in each of the 512 masks
+POPCOUNT = tuple(bin(mask).count('1') for mask in range(ALL_DIGITS+1))
+DIGITS = tuple(tuple(d for d in range(1, 9+1) if mask & BIT[d]) for mask in range(ALL_DIGITS+1))
+
+
+class CandidateMasks:
+    """
+    Free-digit masks of the 9 rows, columns and boxes of a flat 81-cell grid.
+
+    The masks are updated incrementally with place() and unplace(), which keeps
+    every candidates() lookup down to three list reads and two ANDs.
+    """
+
+    __slots__ = ('rows', 'cols', 'boxes')
+
+    def __init__(self, grid=None):
+        """
+        :param grid: Optional iterable of 81 cell values (0 for a blank) to start from.
+        :raises ValueError: When the filled cells of the grid contradict each other.
+        """
+        self.rows = [ALL_DIGITS] * 9
+        self.cols = [ALL_DIGITS] * 9
+        self.boxes = [ALL_DIGITS] * 9
+        if grid is not None:
+            for cell, digit in enumerate(grid):
+                if digit:
+                    if not self.candidates(cell) & BIT[digit]:
+                        raise ValueError('Digit {} repeats in the units of cell {}.'.format(digit, cell))
+                    self.place(cell, digit)
+
+    def place(self, cell, digit):
+        bit = ~BIT[digit]
+        self.rows[ROW_OF[cell]] &= bit
+        self.cols[COL_OF[cell]] &= bit
+        self.boxes[BOX_OF[cell]] &= bit
+
+    def unplace(self, cell, digit):
+        bit = BIT[digit]
+        self.rows[ROW_OF[cell]] |= bit
+        self.cols[COL_OF[cell]] |= bit
+        self.boxes[BOX_OF[cell]] |= bit
+
+    def candidates(self, cell):
+        """
+        :param cell: ID of a cell (0-80).
+        :return: Mask of the digits that can still be put into the cell.
+        """
+        return self.rows[ROW_OF[cell]] & self.cols[COL_OF[cell]] & self.boxes[BOX_OF[cell]]
+
+    def count(self, cell):
+        return POPCOUNT[self.candidates(cell)]
+
+    def digits(self, cell):
+        """
+        :return: Tuple of the digits that can still be put into the cell, ascending.
+        """
+        return DIGITS[self.candidates(cell)]
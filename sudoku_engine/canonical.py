@@ -0,0 +1,195 @@
+"""
+Canonical form of a puzzle: the smallest grid, read row by row with 0 for a
+blank, among all grids reachable by the symmetries of sudoku_engine.symmetry.
+Two grids in which no digit repeats in a row, column or box are the same
+puzzle in disguise exactly when their forms match. The first-row shortcut
+below relies on that, so other grids are rejected rather than given a form
+their equivalents may not share.
+
+Instead of trying all 2 * 6^8 * 9! symmetries, the form is built one row at
+a time and only the partial transformations that produce the smallest rows
+so far are extended:
+ - digits are always relabelled in order of first appearance, which is the
+   smallest labelling for a given cell order, so they never have to be tried;
+ - the first row of a puzzle is decided by where its blanks are, the columns
+   are therefore only ever ordered to put the most blanks first (its digits
+   are distinct, so any order of them relabels to the same 1, 2, 3...);
+ - every further row is the smallest of the at most 6 rows that may follow,
+   all other branches are dropped before going one row deeper.
+
+DedupIndex keeps digests of canonical forms in a file, to skip puzzles that
+were generated before, also by earlier runs.
+"""
+
+from hashlib import blake2b
+from itertools import permutations, product
+
+from sudoku_engine.candidates import CandidateMasks
+from sudoku_engine.tables import BAND_OF_ROW, STACKS
+
+MAGIC = b'SDKDEDU1'
+DIGEST_SIZE = 16
+
+
+def _blank_profile(row):
+    """
+    :return: Numbers of blanks in the 3 stacks of a row, most first. A greater profile gives a smaller first row.
+    """
+    return tuple(sorted((sum(1 for col in stack if not row[col]) for stack in STACKS), reverse=True))
+
+
+def _column_orders(row):
+    """
+    :return: Generator of the column orders that put the blanks of a row first, see _blank_profile().
+    """
+    blanks = [sum(1 for col in stack if not row[col]) for stack in STACKS]
+    # blanks first inside every stack, any order among the blanks and among the filled cells
+    inner = [[order + rest for order in permutations([col for col in stack if not row[col]])
+              for rest in permutations([col for col in stack if row[col]])] for stack in STACKS]
+    for stacks in permutations(range(3)):
+        if blanks[stacks[0]] >= blanks[stacks[1]] >= blanks[stacks[2]]:
+            for parts in product(*(inner[stack] for stack in stacks)):
+                yield parts[0] + parts[1] + parts[2]
+
+
+def _relabel(values, labels, next_label):
+    """
+    :return: (relabelled values, labels, next_label), labels mapping the digits seen so far to their new ones.
+    """
+    labels = list(labels)
+    row = []
+    for value in values:
+        if value and not labels[value]:
+            labels[value] = next_label
+            next_label += 1
+        row.append(labels[value])
+    return tuple(row), labels, next_label
+
+
+def _next_rows(rows):
+    """
+    :param rows: Source rows of the rows placed so far.
+    :return: Source rows that may come next: the rest of the current band, or the first row of a new one.
+    """
+    if len(rows) % 3:
+        band = BAND_OF_ROW[rows[-1]]
+        return [row for row in range(band * 3, band * 3 + 3) if row not in rows]
+    bands = {BAND_OF_ROW[row] for row in rows}
+    return [row for row in range(9) if BAND_OF_ROW[row] not in bands]
+
+
+def canonical_form(grid):
+    """
+    :param grid: Flat grid of 81 cell values (0 for a blank), meant for puzzles: the emptier rows
+        and columns are, the more partial transformations tie, and grids without blanks take long.
+    :return: Canonical form as a tuple of 81 values.
+    :raises ValueError: When a digit repeats in a row, column or box of the grid.
+    """
+    grid = tuple(grid)
+    CandidateMasks(grid)  # raises for the grids the first-row shortcut does not hold for
+    grids = (grid, tuple(grid[col * 9 + row] for row in range(9) for col in range(9)))
+
+    best_profile = None
+    first_rows = []
+    for source in grids:
+        for row in range(9):
+            profile = _blank_profile(source[row*9: row*9 + 9])
+            if best_profile is None or profile > best_profile:
+                best_profile, first_rows = profile, []
+            if profile == best_profile:
+                first_rows.append((source, row))
+
+    # partial transformations: (grid, column order, source rows, digit labels, next label)
+    states = []
+    for source, row in first_rows:
+        values = source[row*9: row*9 + 9]
+        for cols in _column_orders(values):
+            first, labels, next_label = _relabel([values[col] for col in cols], (0,) * 10, 1)
+            states.append((source, cols, (row,), labels, next_label))
+    form = list(first)
+
+    for _ in range(8):
+        best_row = None
+        extended = []
+        for source, cols, rows, labels, next_label in states:
+            for row in _next_rows(rows):
+                values = [source[row * 9 + col] for col in cols]
+                candidate, new_labels, new_next = _relabel(values, labels, next_label)
+                if best_row is None or candidate < best_row:
+                    best_row, extended = candidate, []
+                if candidate == best_row:
+                    extended.append((source, cols, rows + (row,), new_labels, new_next))
+        states = extended
+        form.extend(best_row)
+    return tuple(form)
+
+
+def canonical_key(grid):
+    """
+    :return: DIGEST_SIZE-byte digest of the canonical form of a grid.
+    """
+    return blake2b(bytes(canonical_form(grid)), digest_size=DIGEST_SIZE).digest()
+
+
+class DedupIndex:
+    """
+    Set of canonical_key() digests, held in memory and appended to a file as it grows.
+
+    File layout: the MAGIC header followed by DIGEST_SIZE-byte digests.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: File the digests are loaded from and appended to, created if missing.
+        :raises ValueError: When the file exists but is not a dedup index.
+        """
+        self.path = path
+        self.keys = set()
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+        except FileNotFoundError:
+            data = b''
+        if data and not data.startswith(MAGIC):
+            raise ValueError('{} is not a dedup index.'.format(path))
+        # a digest cut short by an interrupted write is dropped
+        end = len(MAGIC) + (len(data) - len(MAGIC)) // DIGEST_SIZE * DIGEST_SIZE if data else 0
+        self.keys.update(data[offset: offset+DIGEST_SIZE] for offset in range(len(MAGIC), end, DIGEST_SIZE))
+
+        self._file = open(path, 'r+b' if data else 'wb')
+        if data:
+            self._file.seek(end)
+            self._file.truncate()
+        else:
+            self._file.write(MAGIC)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, grid):
+        return canonical_key(grid) in self.keys
+
+    def add_key(self, key):
+        """
+        :param key: canonical_key() of a puzzle, e.g. computed in a worker process.
+        :return: True if the puzzle is new, False if it (or an equivalent one) was added before.
+        """
+        if key in self.keys:
+            return False
+        self.keys.add(key)
+        self._file.write(key)
+        return True
+
+    def add(self, grid):
+        return self.add_key(canonical_key(grid))
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
@@ -0,0 +1,256 @@
+"""
+Headless command line for batch jobs:
+
+    python -m sudoku_engine solve puzzles.txt -o solved.txt -j 16
+    python -m sudoku_engine generate --difficulty hard -n 100000 -o hard.txt -j 16
+
+Puzzles are read and written one per line (see sudoku_engine.puzzle_io),
+progress goes to stderr and --stats writes a JSON summary of the run.
+`solve` writes a line of 81 blanks for every puzzle that is malformed or has
+no solution, so output line N always holds the solution of puzzle N.
+`generate --dedup index.bin` skips puzzles equivalent to ones generated
+before (see sudoku_engine.canonical), across runs sharing the index file.
+`solve --cache solutions.db` answers puzzles solved in earlier runs from a
+dbm file (see sudoku_engine.cache). `serve` runs the JSON-lines puzzle
+service of sudoku_engine.service until interrupted.
+"""
+
+import argparse
+import json
+import os
+import sys
+from contextlib import contextmanager
+from time import perf_counter
+
+from sudoku_engine.batch import FAILED_LINE, generate_many, solve_many
+from sudoku_engine.bank import DIFFICULTIES
+from sudoku_engine.cache import LRUCache
+from sudoku_engine.canonical import DedupIndex
+from sudoku_engine.puzzle_io import format_line, read_puzzles
+from sudoku_engine.rating import RATING_BANDS
+from sudoku_engine.search import BACKENDS
+
+
+class Progress:
+    """
+    Periodic "<count> puzzles, <rate>/s" report on stderr.
+    """
+
+    def __init__(self, label, enabled=True, interval=1.0):
+        self.label = label
+        self.enabled = enabled
+        self.interval = interval
+        self.count = 0
+        self.start = perf_counter()
+        self.last_report = self.start
+
+    def update(self, count=1):
+        self.count += count
+        if self.enabled:
+            now = perf_counter()
+            if now - self.last_report >= self.interval:
+                self.last_report = now
+                self.report(now)
+
+    def report(self, now=None):
+        elapsed = (now or perf_counter()) - self.start
+        sys.stderr.write('\r{} {} puzzles, {:.1f}/s'.format(self.label, self.count, self.count / elapsed if elapsed else 0))
+        sys.stderr.flush()
+
+    def finish(self):
+        if self.enabled:
+            self.report()
+            sys.stderr.write('\n')
+        return perf_counter() - self.start
+
+
+@contextmanager
+def _open_output(path):
+    if path == '-':
+        yield sys.stdout
+    else:
+        with open(path, 'w') as file:
+            yield file
+
+
+@contextmanager
+def _open_input(path):
+    if path == '-':
+        yield sys.stdin
+    else:
+        with open(path) as file:
+            yield file
+
+
+@contextmanager
+def _open_dedup(path):
+    if path is None:
+        yield None
+    else:
+        with DedupIndex(path) as dedup:
+            yield dedup
+
+
+def _positive_int(text):
+    """
+    argparse type of the counts that have to be at least 1.
+    """
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError('invalid int value: {!r}'.format(text)) from None
+    if value < 1:
+        raise argparse.ArgumentTypeError('must be a positive integer, got {}'.format(value))
+    return value
+
+
+def _write_stats(path, stats):
+    if path is None:
+        return
+    if path == '-':
+        sys.stderr.write(json.dumps(stats) + '\n')
+    else:
+        with open(path, 'w') as file:
+            json.dump(stats, file, indent=2)
+
+
+def run_solve(args):
+    solved = failed = 0
+    progress = Progress('solved', not args.quiet)
+    cache = None
+    if args.cache or args.cache_size:
+        cache = LRUCache(args.cache_size or 100000, args.cache)
+    try:
+        with _open_input(args.input) as source, _open_output(args.output) as target:
+            # malformed lines are reported like unsolvable puzzles instead of stopping the run
+            results = solve_many(read_puzzles(source, 'keep'), args.jobs, args.chunksize, True, args.backend,
+                                 args.vectorized, args.trace, cache)
+            for result in results:
+                if result.error:
+                    failed += 1
+                    if not args.quiet:
+                        sys.stderr.write('\rpuzzle {}: {}\n'.format(result.index + 1, result.error))
+                    # keeps output line N on puzzle N
+                    target.write(FAILED_LINE + '\n')
+                else:
+                    solved += 1
+                    target.write(format_line(result.solution) + '\n')
+                progress.update()
+    finally:
+        # a dbm file that is not closed may lose the entries written so far
+        if cache is not None:
+            cache.close()
+    elapsed = progress.finish()
+
+    _write_stats(args.stats, {
+        'command': 'solve', 'backend': args.backend, 'vectorized': args.vectorized, 'workers': args.jobs,
+        'puzzles': solved + failed, 'solved': solved, 'failed': failed, 'elapsed': elapsed, 'per_second': (solved + failed) / elapsed,
+        'cache': cache.stats() if cache is not None else None,
+    })
+    return 1 if failed else 0
+
+
+def run_generate(args):
+    if args.dedup and args.multiply > 1:
+        sys.stderr.write('--dedup cannot be combined with --multiply, its puzzles are all equivalent\n')
+        return 2
+    progress = Progress('generated', not args.quiet)
+    with _open_output(args.output) as target, _open_dedup(args.dedup) as dedup:
+        known = len(dedup) if dedup is not None else 0
+        puzzles = generate_many(args.difficulty, args.count, args.jobs, args.chunksize, args.band, args.seed,
+                                args.multiply, dedup, args.trace)
+        for solved, unsolved in puzzles:
+            line = format_line(unsolved)
+            if args.with_solutions:
+                line += ' ' + format_line(solved)
+            target.write(line + '\n')
+            progress.update()
+    elapsed = progress.finish()
+
+    _write_stats(args.stats, {
+        'command': 'generate', 'difficulty': args.difficulty, 'band': args.band, 'seed': args.seed,
+        'multiply': args.multiply, 'dedup': args.dedup, 'known': known, 'workers': args.jobs, 'puzzles': progress.count,
+        'elapsed': elapsed, 'per_second': progress.count / elapsed,
+    })
+    return 0
+
+
+def run_serve(args):
+    # imported here, the batch commands do not need asyncio
+    import asyncio
+
+    from sudoku_engine.service import serve
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, workers=args.jobs, batch_size=args.batch_size,
+                          batch_delay=args.batch_delay, max_pending=args.max_pending, timeout=args.timeout,
+                          warm_size=args.warm, cache_size=args.cache_size, trace=args.trace))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m sudoku_engine', description='Batch sudoku solver and generator.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('-o', '--output', default='-', help="output file, '-' for stdout (default)")
+    common.add_argument('-j', '--jobs', type=_positive_int, default=None, help='worker processes (default: CPU count)')
+    common.add_argument('--stats', metavar='FILE', help="write a JSON summary of the run, '-' for stderr")
+    common.add_argument('--trace', metavar='FILE',
+                        help='append solver and generator events to FILE as JSON lines (see sudoku_engine.stats)')
+    common.add_argument('-q', '--quiet', action='store_true', help='no progress or error reports')
+
+    solve_parser = commands.add_parser('solve', parents=[common], help='solve puzzles, one per line')
+    solve_parser.add_argument('input', help="input file, '-' for stdin")
+    solve_parser.add_argument('--backend', choices=BACKENDS, default='mrv')
+    solve_parser.add_argument('--chunksize', type=_positive_int, default=64, help='puzzles sent to a worker at once')
+    solve_parser.add_argument('--vectorized', action='store_true',
+                              help='fill in the singles of whole chunks with NumPy before searching (needs numpy)')
+    solve_parser.add_argument('--cache', metavar='FILE',
+                              help='dbm file of solutions kept across runs, puzzles found in it are not solved again')
+    solve_parser.add_argument('--cache-size', type=int, default=0, metavar='N',
+                              help='solutions kept in memory, repeated puzzles are solved once (default: 100000 with --cache)')
+    solve_parser.set_defaults(run=run_solve)
+
+    generate_parser = commands.add_parser('generate', parents=[common], help='generate new puzzles')
+    generate_parser.add_argument('-d', '--difficulty', choices=DIFFICULTIES, default='easy')
+    generate_parser.add_argument('-n', '--count', type=_positive_int, default=1)
+    generate_parser.add_argument('--band', choices=RATING_BANDS,
+                                 help='rating band the puzzles have to fall into (default: any)')
+    generate_parser.add_argument('--chunksize', type=_positive_int, default=1, help='puzzles generated by a worker at once')
+    generate_parser.add_argument('--seed', type=int, help='seed of the first puzzle, makes the output reproducible')
+    generate_parser.add_argument('--multiply', type=_positive_int, default=1, metavar='N',
+                                 help='derive N puzzles from every generated one by symmetry transformations')
+    generate_parser.add_argument('--dedup', metavar='FILE',
+                                 help='index of the puzzles generated so far, equivalent puzzles are skipped')
+    generate_parser.add_argument('--with-solutions', action='store_true',
+                                 help='append the solution to every line, after a space')
+    generate_parser.set_defaults(run=run_generate)
+
+    serve_parser = commands.add_parser('serve', help='answer solve, rate and generate requests, JSON lines over a socket')
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8765, help='TCP port, 0 for any free one (default: 8765)')
+    serve_parser.add_argument('--unix', metavar='PATH', help='listen on a Unix socket instead of TCP')
+    serve_parser.add_argument('-j', '--jobs', type=_positive_int, default=None, help='worker processes (default: CPU count)')
+    serve_parser.add_argument('--batch-size', type=_positive_int, default=64, help='requests sent to a worker at once')
+    serve_parser.add_argument('--batch-delay', type=float, default=0.002, metavar='SECONDS',
+                              help='time a request waits for others to join its batch')
+    serve_parser.add_argument('--max-pending', type=_positive_int, default=1024,
+                              help='requests in progress beyond which the sockets are no longer read')
+    serve_parser.add_argument('--timeout', type=float, default=10.0, metavar='SECONDS',
+                              help='default time after which a request is answered with an error')
+    serve_parser.add_argument('--warm', type=int, default=16, metavar='N',
+                              help='games kept ready per difficulty, 0 to generate them on request')
+    serve_parser.add_argument('--cache-size', type=int, default=100000, metavar='N', help='solutions kept in memory')
+    serve_parser.add_argument('--trace', metavar='FILE',
+                              help='append solver and generator events to FILE as JSON lines (see sudoku_engine.stats)')
+    serve_parser.set_defaults(run=run_serve)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.jobs = args.jobs or os.cpu_count() or 1
+    return args.run(args)
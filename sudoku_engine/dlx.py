@@ -0,0 +1,207 @@
+"""
+Exact-cover solver based on Knuth's Algorithm X with Dancing Links.
+
+A sudoku is an exact cover problem over 324 constraints (every cell holds one
+digit, every row, column and box holds every digit once) and 729 options
+(digit d in cell c), each option covering exactly four constraints. The
+links are kept in flat integer lists; a pristine copy of the full matrix is
+built once at import and cloned for every grid.
+"""
+
+from sudoku_engine import stats
+from sudoku_engine.tables import BOX_OF, COL_OF, ROW_OF
+
+N_COLUMNS = 324
+
+
+def _option_columns(cell, digit):
+    return (cell,
+            81 + ROW_OF[cell]*9 + digit-1,
+            162 + COL_OF[cell]*9 + digit-1,
+            243 + BOX_OF[cell]*9 + digit-1)
+
+
+def _build_matrix():
+    # node 0 is the root, nodes 1-324 are the column headers
+    left = [N_COLUMNS] + list(range(N_COLUMNS))
+    right = list(range(1, N_COLUMNS+1)) + [0]
+    up = list(range(N_COLUMNS+1))
+    down = list(range(N_COLUMNS+1))
+    column = list(range(N_COLUMNS+1))
+    option = [-1] * (N_COLUMNS+1)
+    size = [0] * (N_COLUMNS+1)
+    first_node = []
+
+    for cell in range(81):
+        for digit in range(1, 9+1):
+            first = len(left)
+            first_node.append(first)
+            for offset, col in enumerate(_option_columns(cell, digit)):
+                node = first + offset
+                header = col + 1
+                left.append(first + (offset-1) % 4)
+                right.append(first + (offset+1) % 4)
+                up.append(up[header])
+                down.append(header)
+                down[up[header]] = node
+                up[header] = node
+                column.append(header)
+                option.append(cell*9 + digit-1)
+                size[header] += 1
+
+    return left, right, up, down, column, option, size, tuple(first_node)
+
+
+_LEFT, _RIGHT, _UP, _DOWN, _COLUMN, _OPTION, _SIZE, _FIRST_NODE = _build_matrix()
+
+
+class DancingLinks:
+    """
+    Exact-cover matrix of one grid, with the options of its filled cells already chosen.
+    An instance is consumed by a single search.
+    """
+
+    __slots__ = ('left', 'right', 'up', 'down', 'size', 'chosen', 'nodes', 'backtracks')
+
+    def __init__(self, grid):
+        """
+        :param grid: Iterable of 81 cell values (0 for a blank).
+        :raises ValueError: When the filled cells of the grid contradict each other.
+        """
+        self.left = _LEFT[:]
+        self.right = _RIGHT[:]
+        self.up = _UP[:]
+        self.down = _DOWN[:]
+        self.size = _SIZE[:]
+        self.chosen = []
+        self.nodes = 0  # options tried
+        self.backtracks = 0  # dead ends: a constraint left without options
+
+        covered = set()
+        for cell, digit in enumerate(grid):
+            if digit:
+                node = _FIRST_NODE[cell*9 + digit-1]
+                for offset in range(4):
+                    header = _COLUMN[node+offset]
+                    if header in covered:
+                        raise ValueError('Digit {} repeats in the units of cell {}.'.format(digit, cell))
+                    covered.add(header)
+                    self._cover(header)
+                self.chosen.append(_OPTION[node])
+
+    def _cover(self, header):
+        left, right, up, down, size = self.left, self.right, self.up, self.down, self.size
+        right[left[header]] = right[header]
+        left[right[header]] = left[header]
+        i = down[header]
+        while i != header:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                size[_COLUMN[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def _uncover(self, header):
+        left, right, up, down, size = self.left, self.right, self.up, self.down, self.size
+        i = up[header]
+        while i != header:
+            j = left[i]
+            while j != i:
+                size[_COLUMN[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[header]] = header
+        left[right[header]] = header
+
+    def search(self):
+        """
+        Yields every exact cover of the matrix as a list of chosen options (cell*9 + digit-1).
+        """
+        right, down, size = self.right, self.down, self.size
+        header = right[0]
+        if header == 0:
+            yield list(self.chosen)
+            return
+
+        # the constraint with the fewest remaining options keeps the tree narrow
+        best = header
+        while header and size[best] > 1:
+            if size[header] < size[best]:
+                best = header
+            header = right[header]
+        if not size[best]:
+            self.backtracks += 1
+            return
+
+        self._cover(best)
+        node = down[best]
+        while node != best:
+            self.nodes += 1
+            self.chosen.append(_OPTION[node])
+            j = right[node]
+            while j != node:
+                self._cover(_COLUMN[j])
+                j = right[j]
+
+            yield from self.search()
+
+            j = self.left[node]
+            while j != node:
+                self._uncover(_COLUMN[j])
+                j = self.left[j]
+            self.chosen.pop()
+            node = down[node]
+        self._uncover(best)
+
+    def report(self, solutions):
+        # the givens are covered up front, the search itself does no propagation
+        stats.emit('search', backend='dlx', nodes=self.nodes, backtracks=self.backtracks, propagations=0,
+                   solutions=solutions)
+
+
+def iter_solutions(grid):
+    """
+    Yields every solution of a grid as a flat list of 81 digits.
+    """
+    try:
+        matrix = DancingLinks(grid)
+    except ValueError:
+        return
+    covers = matrix.search()
+    if stats.enabled:
+        covers = stats.counted(covers, matrix.report)
+    for chosen in covers:
+        solution = [0] * 81
+        for option in chosen:
+            solution[option // 9] = option % 9 + 1
+        yield solution
+
+
+def solve(grid):
+    """
+    :return: A solution of the grid as a flat list of 81 digits, or None if there is none.
+    """
+    return next(iter_solutions(grid), None)
+
+
+def count_solutions(grid, limit=2):
+    """
+    :return: Number of solutions of the grid, at most `limit`.
+    """
+    try:
+        matrix = DancingLinks(grid)
+    except ValueError:
+        return 0
+    covers = matrix.search()
+    if stats.enabled:
+        covers = stats.counted(covers, matrix.report)
+    found = 0
+    for _ in covers:
+        found += 1
+        if found >= limit:
+            break
+    return found
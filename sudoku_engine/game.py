@@ -0,0 +1,146 @@
+"""
+State of a game being played, kept up to date move by move.
+
+Every change goes through Game.set(), which adjusts the counts of every digit
+per row, column and box, the count of every digit on the board, the cells
+holding every digit and the cells that differ from the solution. Checking a
+digit against its row, column and box, telling whether the game is won, how
+many of a digit are left or where it stands then take a few lookups instead
+of a pass over the board.
+
+The GUI subscribes to the changes and only updates the cells they name.
+"""
+
+from collections import namedtuple
+from random import choice
+
+from sudoku_engine.grid import Grid
+from sudoku_engine.tables import AREA, UNIT_IDS_OF
+
+# cell - ID 0-80, before / after - digit (0 for a blank), kind - 'move', 'hint' or 'undo'
+Change = namedtuple('Change', ['cell', 'before', 'after', 'kind'])
+
+
+class Game:
+    """
+    Board of a game with its solution, the givens, the hints and the move history.
+    """
+
+    __slots__ = ('solution', 'cells', 'givens', 'hinted', 'unit_counts', 'digit_counts', 'positions',
+                 'wrong', 'history', 'listeners')
+
+    def __init__(self, solved, unsolved):
+        """
+        :param solved: Flat grid of the solution.
+        :param unsolved: Flat grid of the puzzle, 0 for a blank.
+        """
+        self.solution = bytes(Grid(solved))
+        self.cells = Grid(unsolved)
+        self.givens = frozenset(cell for cell in range(81) if self.cells[cell])
+        self.hinted = set()  # cells filled in by hint()
+        self.unit_counts = [0] * 270  # unit*10 + digit -> cells of the unit holding the digit
+        self.digit_counts = [0] * 10  # digit -> cells holding it, digit_counts[0] counts the blanks
+        self.positions = [set() for _ in range(10)]  # digit -> set of the cells holding it, positions[0] the blanks
+        self.wrong = set()  # cells whose value differs from the solution, blanks included
+        self.history = []  # Change of every undoable set(), oldest first
+        self.listeners = []
+        for cell, digit in enumerate(self.cells):
+            self._count(cell, digit, 1)
+            if digit != self.solution[cell]:
+                self.wrong.add(cell)
+
+    @property
+    def won(self):
+        return not self.wrong
+
+    @property
+    def missing(self):
+        """
+        :return: Number of blank cells.
+        """
+        return self.digit_counts[0]
+
+    def subscribe(self, listener):
+        """
+        :param listener: Callable taking the Change of every set(), called after the state is updated.
+        """
+        self.listeners.append(listener)
+
+    def _count(self, cell, digit, delta):
+        self.digit_counts[digit] += delta
+        if delta > 0:
+            self.positions[digit].add(cell)
+        else:
+            self.positions[digit].discard(cell)
+        if digit:
+            for unit in UNIT_IDS_OF[cell]:
+                self.unit_counts[unit*10 + digit] += delta
+
+    def is_given(self, cell):
+        return cell in self.givens
+
+    def is_hint(self, cell):
+        return cell in self.hinted
+
+    def can_place(self, cell, digit):
+        """
+        :return: Whether no other cell of the row, column or box of the cell holds the digit.
+        """
+        if self.cells[cell] == digit:
+            return True
+        counts = self.unit_counts
+        row, col, box = UNIT_IDS_OF[cell]
+        return not (counts[row*10 + digit] or counts[col*10 + digit] or counts[box*10 + digit])
+
+    def conflicts(self, cell, digit):
+        """
+        :return: Other cells of the row, column and box of the cell holding the digit.
+        """
+        if self.can_place(cell, digit):
+            return []
+        return [other for other in AREA[cell] if other != cell and self.cells[other] == digit]
+
+    def set(self, cell, digit, kind='move'):
+        """
+        Changes a cell and notifies the listeners. Moves go to the history, hints and undos do not.
+        :param digit: New digit, 0 to erase.
+        :return: The Change, None when the cell already held the digit.
+        """
+        before = self.cells[cell]
+        if before == digit:
+            return None
+        self.cells[cell] = digit
+        self._count(cell, before, -1)
+        self._count(cell, digit, 1)
+        if digit == self.solution[cell]:
+            self.wrong.discard(cell)
+        else:
+            self.wrong.add(cell)
+
+        change = Change(cell, before, digit, kind)
+        if kind == 'move':
+            self.history.append(change)
+        for listener in self.listeners:
+            listener(change)
+        return change
+
+    def hint(self):
+        """
+        Fills a random wrong or blank cell with its solution digit.
+        :return: The Change, None when the game is won.
+        """
+        if not self.wrong:
+            return None
+        cell = choice(tuple(self.wrong))
+        self.hinted.add(cell)
+        return self.set(cell, self.solution[cell], 'hint')
+
+    def undo(self):
+        """
+        Reverts the last move.
+        :return: The Change made, None when there is no move to undo.
+        """
+        if not self.history:
+            return None
+        move = self.history.pop()
+        return self.set(move.cell, move.before, 'undo')
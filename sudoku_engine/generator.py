@@ -0,0 +1,570 @@
+"""
+Puzzle generation: filling a complete grid and removing clues from it while
+the puzzle keeps a single solution that can be reached by logic alone.
+"""
+
+from collections import namedtuple
+from functools import lru_cache
+from random import Random
+from time import perf_counter
+
+from sudoku_engine import stats
+from sudoku_engine.cache import LRUCache
+from sudoku_engine.candidates import BIT, CandidateMasks
+from sudoku_engine.grid import Grid
+from sudoku_engine.logic import logic_solve
+from sudoku_engine.rating import get_band, rating_of
+from sudoku_engine.search import count_solutions, solve
+from sudoku_engine.tables import UNITS_OF
+
+# solved, unsolved - flat grids of the puzzle, complete - False when the budget ran out and unsolved
+# is the puzzle with the fewest clues found, attempts - remove_values() runs, failures - refused
+# removals over all attempts, elapsed - seconds spent
+GenerationResult = namedtuple('GenerationResult', ['solved', 'unsolved', 'complete', 'attempts', 'failures', 'elapsed'])
+
+# verdicts kept per solution by a Sudoku instance, a few times the removals of one puzzle
+VERDICT_CACHE_SIZE = 4096
+
+
+class GenerationTimeout(Exception):
+    """
+    Raised by generate() when its budget ran out before the puzzle was ready.
+    The best puzzle found so far is kept in the `result` attribute.
+    """
+
+    def __init__(self, result):
+        super().__init__('Puzzle not ready after {} attempts ({:.3f}s).'.format(result.attempts, result.elapsed))
+        self.result = result
+
+
+def _check_budget(timeout, max_attempts):
+    if timeout is not None and timeout < 0:
+        raise ValueError('The timeout cannot be negative, got {}.'.format(timeout))
+    if max_attempts is not None and max_attempts < 1:
+        raise ValueError('max_attempts has to be at least 1, got {}.'.format(max_attempts))
+
+
+class Sudoku:
+
+    def __init__(self, difficulty='easy', backend='backtrack', seed=None):
+        self.grid = Grid()  # the solution while a puzzle is being prepared from it
+        self.backend = backend  # search algorithm used for solving and uniqueness checks
+        # all the randomness of the generator, the same seed always gives the same puzzles
+        self.random = Random(seed)
+        self.player_grid = Grid()
+        self.masks = None
+        # self.player_grid = remove_values(difficulty)
+
+        self.record = 0
+        self.time = 0
+        self.counter = 0
+        self.rating = None  # Rating of the grid last checked by human_solve()
+        self.rating_band = None  # (lowest, highest) score the puzzle being prepared has to fit in
+        self.score = 0.0  # rating score of the grid while a puzzle is prepared under a rating band
+        self.solution = None  # snapshot of the solution the puzzle being prepared is taken from
+        self.removals = []  # (trail mark, score) before every removal kept in the puzzle being prepared
+        self.removal_masks = None  # CandidateMasks of the grid as remove_values() last kept it
+        # grid bytes + rating band -> single_solution_check() result, for the current solution
+        self.verdicts = LRUCache(VERDICT_CACHE_SIZE)
+        self.attempts = 0  # remove_values() runs made by the last prepare_grid()
+        self.failures = 0  # removals refused during the last prepare_grid()
+        self.elapsed = 0  # seconds taken by the last prepare_grid()
+        self.solver_calls = 0  # human_solve(), solve_grid() and count_solutions() runs
+        self.fill_nodes = 0  # digits tried by the last generate_grid()
+        self.fill_backtracks = 0  # digits it had to take back
+
+    def get_grids(self):
+        return self.grid.tolist(), self.player_grid.tolist()
+
+    def generate_grid(self):
+        with stats.phase('generate_grid'):
+            self.verdicts = LRUCache(VERDICT_CACHE_SIZE)
+            self.masks = CandidateMasks(self.grid)
+            self.fill_nodes = self.fill_backtracks = 0
+            self._guess_field_value()
+        if stats.enabled:
+            stats.emit('fill', nodes=self.fill_nodes, backtracks=self.fill_backtracks)
+        return self.grid
+
+    def _get_possible_inputs(self, field):
+        """
+        Returns the digits that can be put into the cell without breaking its row, column or box.
+        Relies on self.masks being in sync with self.grid.
+        :param field: ID of a cell to figure out the possible inputs for.
+        :return: Possible inputs to the specified cell, shuffled.
+        """
+        possibilities = list(self.masks.digits(field))
+        self.random.shuffle(possibilities)
+        return possibilities
+
+    def _guess_field_value(self, field=0):
+        possibilities = self._get_possible_inputs(field)
+        for current_choice in possibilities:
+            self.fill_nodes += 1
+            self.grid[field] = current_choice
+
+            if field == 80:
+                return True
+
+            self.masks.place(field, current_choice)
+            if self._guess_field_value(field+1):
+                return True
+            self.masks.unplace(field, current_choice)
+            self.fill_backtracks += 1
+
+        # backtrace
+        self.grid[field] = 0
+        return False
+
+    def solve_grid(self, field=0, backend=None):
+        """
+        Checks whether the grid can be completed, leaving it untouched.
+        :param field: ID of the cell to start the row-major backtracking from.
+        :param backend: Search algorithm ('backtrack', 'mrv' or 'dlx'), the instance's one by default.
+        :return: True if the grid has a solution.
+        """
+        self.solver_calls += 1
+        backend = backend or self.backend
+        if backend != 'backtrack':
+            return solve(self.grid, backend) is not None
+
+        try:
+            self.masks = CandidateMasks(self.grid)
+        except ValueError:
+            return False
+        return self._solve_field(field)
+
+    def _solve_field(self, field):
+        if self.grid[field] == 0:
+            possibilities = self._get_possible_inputs(field)
+            for current_choice in possibilities:
+                self.grid[field] = current_choice
+
+                if field == 80:
+                    self.grid[field] = 0
+                    return True
+
+                self.masks.place(field, current_choice)
+                solved = self._solve_field(field+1)
+                self.masks.unplace(field, current_choice)
+                if solved:
+                    self.grid[field] = 0
+                    return True
+
+            # BACKTRACE
+            self.grid[field] = 0
+            return False
+
+        elif field == 80:
+            return True
+        else:
+            return self._solve_field(field+1)
+
+    def prepare_grid(self, difficulty='easy', band=None, timeout=None, max_attempts=None):
+        """
+        Removes values from the solved grid until it becomes a puzzle, retrying until it succeeds
+        or the budget runs out.
+        :param difficulty: 'easy', 'medium' or 'hard', decides the number of clues left.
+        :param band: Optional rating band the puzzle has to fall into, see remove_values().
+        :param timeout: Seconds after which to give up, no limit by default.
+        :param max_attempts: Number of remove_values() runs after which to give up, no limit by default.
+        :return: True if the puzzle got prepared. Otherwise player_grid holds the puzzle with the fewest clues found.
+        :raises ValueError: For a negative timeout or fewer than 1 attempt.
+        """
+        _check_budget(timeout, max_attempts)
+        start = perf_counter()
+        deadline = start + timeout if timeout is not None else None
+        self.failures = 0
+        best = None
+        ready = False
+        attempt = 1
+        while not ready:
+            if stats.enabled:
+                stats.emit('attempt', attempt=attempt, difficulty=difficulty)
+            self.attempts = attempt
+            with stats.phase('remove_values', difficulty=difficulty) as outcome:
+                ready = outcome['ready'] = self.remove_values(difficulty, band, deadline, resume=attempt > 1)
+            if not ready:
+                # what is left after a failed attempt is still a valid, only easier, puzzle
+                if best is None or self.grid.count(0) > best.count(0):
+                    best = self.grid.copy()
+                if attempt == max_attempts or (deadline is not None and perf_counter() >= deadline):
+                    self.grid.undo()
+                    self.player_grid = best
+                    break
+                # the next attempt goes on from this puzzle, with twice as many of its last removals
+                # taken back after every failed attempt so that a dead end is soon left behind
+                self._back_off(2 ** (attempt - 1))
+                attempt += 1
+
+        self.elapsed = perf_counter() - start
+        return ready
+
+    def remove_values(self, difficulty='easy', band=None, deadline=None, resume=False):
+        """
+        :param difficulty: 'easy', 'medium' or 'hard', decides the number of clues left.
+        :param band: Optional rating band (name from rating.RATING_BANDS or a (lowest, highest) pair).
+            Removals that would rate the puzzle above the band are refused and, once the clue count
+            is reached, values keep being removed until the rating gets into the band.
+        :param deadline: Optional time.perf_counter() value after which to give up.
+        :param resume: Go on from the values a failed run left removed (see _back_off()) instead of
+            starting from the full solution.
+        :return: True if the puzzle got prepared, False if too many removals failed or the deadline passed.
+            A failed run leaves its removals in the grid.
+        """
+        self.rating_band = get_band(band) if band is not None else None
+        if not resume:
+            # the removals are recorded on the trail of the grid, so the solution is restored by undoing them
+            self.grid.trail.clear()
+            self.solution = self.grid.snapshot()
+            self.removals = []
+            self.score = 0.0
+        quantities = {digit: self.grid.count(digit) for digit in range(1, 9+1)}
+        emptied = 0 in quantities.values()
+        goal = 0
+        if difficulty == 'easy':
+            goal = 40
+        if difficulty == 'medium':
+            goal = 34
+        if difficulty == 'hard':
+            goal = 28
+        removed = [cell for cell in range(81) if not self.grid[cell]]
+        # kept in step with the removals by removal_check(), built once per run
+        self.removal_masks = CandidateMasks(self.grid)
+
+        fail_count = 0
+        base_grid = self.solution
+
+        while len(removed) < 81-goal or (self.rating_band and self.score < self.rating_band[0]):
+            if deadline is not None and perf_counter() >= deadline:
+                self.failures += fail_count
+                return False
+
+            rm1 = self.random.choice([x for x in range(81) if x not in removed])
+            rm2 = 80 - rm1
+            num1 = self.grid[rm1]
+            num2 = self.grid[rm2]
+            mark = self.grid.mark()
+            score = self.score
+
+            if rm1 == rm2:
+                if quantities[num1] > 1:
+                    self.grid.set(rm1, 0)
+                    if self.removal_check(base_grid, (rm1,)):
+                        removed.append(rm1)
+                        quantities[num1] -= 1
+                    else:
+                        self.grid.undo(mark)
+                        fail_count += 1
+                elif not emptied:
+                    self.grid.set(rm1, 0)
+                    if self.removal_check(base_grid, (rm1,)):
+                        removed.append(rm1)
+                        quantities[num1] -= 1
+                        emptied = True
+                    else:
+                        self.grid.undo(mark)
+                        fail_count += 1
+                # continue
+            else:
+                if num1 != num2:
+                    if quantities[num1] > 1 and quantities[num2] > 1:
+                        self.grid.set(rm1, 0)
+                        self.grid.set(rm2, 0)
+                        if self.removal_check(base_grid, (rm1, rm2)):
+                            removed.append(rm1)
+                            removed.append(rm2)
+                            quantities[num1] -= 1
+                            quantities[num1] -= 1
+                        else:
+                            self.grid.undo(mark)
+                            fail_count += 1
+                    elif not emptied and quantities[num1] != quantities[num2]:
+                        self.grid.set(rm1, 0)
+                        self.grid.set(rm2, 0)
+                        if self.removal_check(base_grid, (rm1, rm2)):
+                            removed.append(rm1)
+                            removed.append(rm2)
+                            quantities[num1] -= 1
+                            quantities[num1] -= 1
+                            emptied = True
+                        else:
+                            self.grid.undo(mark)
+                            fail_count += 1
+                    # continue
+                else:
+                    if quantities[num1] > 2:
+                        self.grid.set(rm1, 0)
+                        self.grid.set(rm2, 0)
+                        if self.removal_check(base_grid, (rm1, rm2)):
+                            removed.append(rm1)
+                            removed.append(rm2)
+                            quantities[num1] -= 2
+                        else:
+                            self.grid.undo(mark)
+                            fail_count += 1
+                    elif not emptied and quantities[num1] == 2:
+                        self.grid.set(rm1, 0)
+                        self.grid.set(rm2, 0)
+                        if self.removal_check(base_grid, (rm1, rm2)):
+                            removed.append(rm1)
+                            removed.append(rm2)
+                            quantities[num1] -= 2
+                            emptied = True
+                        else:
+                            self.grid.undo(mark)
+                            fail_count += 1
+                    # continue
+            if self.grid.mark() != mark:  # the removal was kept
+                self.removals.append((mark, score))
+            if fail_count >= 10:
+                self.failures += fail_count
+                return False
+
+        self.failures += fail_count
+        self.player_grid = self.grid.copy()
+        self.grid.undo()
+        return True
+
+    def count_solutions(self, limit=2, backend=None):
+        """
+        Counts the solutions of the current grid, giving up once `limit` of them are found.
+        :param limit: Number of solutions after which the search stops.
+        :param backend: Search algorithm ('backtrack', 'mrv' or 'dlx'), the instance's one by default.
+        :return: Number of solutions found, at most `limit`.
+        """
+        self.solver_calls += 1
+        return count_solutions(self.grid, limit, backend or self.backend)
+
+    def single_solution_check(self, solved_grid):
+        """
+        Checks whether the current grid is a fair puzzle: logic alone (which is deterministic and only
+        makes forced deductions) leads to solved_grid, so the solution is also unique.
+        :param solved_grid: The expected solution.
+        :return: True if the grid can be solved by logic and, when a rating band is set, rates within it.
+        """
+        with stats.phase('single_solution_check') as outcome:
+            verdict = outcome['verdict'] = self.human_solve(solved_grid) and not (
+                self.rating_band and self.rating.score > self.rating_band[1])
+        return verdict
+
+    def removal_check(self, solved_grid, cells):
+        """
+        single_solution_check() of a grid that passed it before `cells` were emptied.
+        Verdicts are cached per grid. When the emptied cells are forced right back by the
+        remaining clues, the grid leads in one step to the one that passed, so it is not solved again.
+        The cells of a removal that is kept are taken out of self.removal_masks.
+        :param solved_grid: The expected solution.
+        :param cells: IDs of the cells that have just been emptied.
+        :return: The single_solution_check() verdict.
+        """
+        key = bytes(self.grid) + repr(self.rating_band).encode()
+        value = self.verdicts.get(key)
+        cached = value is not None
+        forced = False
+        if cached:
+            verdict = value[:1] == b'1'
+            if verdict and self.rating_band:
+                self.score = float(value[1:])
+        else:
+            # a forced cell may still change the rating, so rated puzzles are always solved
+            forced = self.rating_band is None and self._forced_back(solved_grid, cells)
+            verdict = forced or self.single_solution_check(solved_grid)
+            if verdict and self.rating_band:
+                # kept along with the verdict, so the score of the grid never has to be rated again
+                self.score = self.rating.score
+                self.verdicts.put(key, b'1' + repr(self.score).encode())
+            else:
+                self.verdicts.put(key, b'1' if verdict else b'0')
+        if verdict:
+            for cell in cells:
+                self.removal_masks.unplace(cell, solved_grid[cell])
+        if stats.enabled:
+            stats.emit('removal_check', cached=cached, forced=forced, verdict=verdict)
+        return verdict
+
+    def _back_off(self, count):
+        """
+        Takes back the last `count` removals kept in the grid by remove_values(), all of them at most.
+        """
+        mark = self.grid.mark()
+        while count and self.removals:
+            mark, self.score = self.removals.pop()
+            count -= 1
+        self.grid.undo(mark)
+
+    def _forced_back(self, solved_grid, cells):
+        """
+        Works on self.removal_masks, the masks of the grid before the cells were emptied: the cells are
+        taken out of them, put back one by one as they are found forced, and all of them are back on return.
+        Only the units of the emptied cells are looked at.
+        :return: True if every one of the cells is a naked or hidden single, one after another.
+        """
+        masks = self.removal_masks
+        for cell in cells:
+            masks.unplace(cell, solved_grid[cell])
+        pending = list(cells)
+        while pending:
+            for cell in pending:
+                bit = BIT[solved_grid[cell]]
+                if masks.candidates(cell) == bit or any(
+                        all(other == cell or self.grid[other] or (other in cells and other not in pending)
+                            or not masks.candidates(other) & bit for other in unit)
+                        for unit in UNITS_OF[cell]):
+                    masks.place(cell, solved_grid[cell])
+                    pending.remove(cell)
+                    break
+            else:
+                for cell in pending:
+                    masks.place(cell, solved_grid[cell])
+                return False
+        return True
+
+    def human_solve(self, solved_grid):
+        """
+        Checks whether the current grid can be solved by logic alone (see sudoku_engine.logic).
+        :param solved_grid: The expected solution.
+        :return: True if the logical solver completes the grid into solved_grid.
+        """
+        self.solver_calls += 1
+        solver = logic_solve(self.grid)
+        self.rating = rating_of(solver)
+        return solver.grid == list(solved_grid)
+
+    def print_solo_grid(self, select='solved'):
+        if select == 'solved':
+            for i in range(9):
+                buffer = ''
+                for j in range(9):
+                    buffer += str(self.grid[i*9+j]) + ' '
+                print(buffer)
+        elif select == 'player':
+            for i in range(9):
+                buffer = ''
+                for j in range(9):
+                    buffer += str(self.player_grid[i*9+j]) + ' '
+                print(buffer)
+        else:
+            print('This feature is not implemented.')
+
+    def print_both_grids(self):
+        for i in range(9):
+            buffer = ''
+            for j in range(9):
+                buffer += str(self.grid[i*9+j]) + ' '
+            buffer += '  |  '
+            for j in range(9):
+                buffer += str(self.player_grid[i*9+j]) + ' '
+            print(buffer)
+
+
+def generate_puzzle(difficulty='easy', band=None, seed=None):
+    """
+    Generates a new game.
+    :param band: Optional rating band the puzzle has to fall into, see Sudoku.remove_values().
+    :param seed: Seed of the generator, a random game by default.
+    :return: (solved, unsolved) flat grids.
+    """
+    sudoku = Sudoku(seed=seed)
+    sudoku.generate_grid()
+    sudoku.prepare_grid(difficulty, band)
+    return sudoku.get_grids()
+
+
+def generate(difficulty='easy', band=None, timeout=None, max_attempts=None, accept_partial=True, seed=None):
+    """
+    Generates a new game within a time and/or attempt budget.
+    :param band: Optional rating band the puzzle has to fall into, see Sudoku.remove_values().
+    :param timeout: Seconds after which to give up, no limit by default.
+    :param max_attempts: Number of remove_values() runs after which to give up, no limit by default.
+    :param accept_partial: When the budget runs out, return the best puzzle found instead of raising,
+        as long as at least one value got removed from the solution.
+    :param seed: Seed of the generator, a random game by default. Only reproducible without a timeout.
+    :return: GenerationResult.
+    :raises GenerationTimeout: When the budget ran out and accept_partial is False, or before any value
+        was removed.
+    :raises ValueError: For a negative timeout or fewer than 1 attempt.
+    """
+    _check_budget(timeout, max_attempts)
+    start = perf_counter()
+    sudoku = Sudoku(seed=seed)
+    sudoku.generate_grid()
+    remaining = None if timeout is None else max(0, timeout - (perf_counter() - start))
+    complete = sudoku.prepare_grid(difficulty, band, remaining, max_attempts)
+    result = GenerationResult(sudoku.grid.tolist(), sudoku.player_grid.tolist(), complete, sudoku.attempts,
+                              sudoku.failures, perf_counter() - start)
+    # a full grid is no puzzle, not even a partial one
+    if not complete and (not accept_partial or 0 not in result.unsolved):
+        raise GenerationTimeout(result)
+    return result
+
+
+def generate_puzzles(difficulty='easy', count=None, band=None, seed=None):
+    """
+    Yields new games one by one, e.g. to stream them into a file with sudoku_engine.write_puzzles().
+    :param count: Number of games to generate, endless if None.
+    :param seed: Seed of the first game, the following ones use seed+1, seed+2... Random games by default.
+    :return: Generator of (solved, unsolved) flat grids.
+    """
+    generated = 0
+    while count is None or generated < count:
+        yield generate_puzzle(difficulty, band, None if seed is None else seed + generated)
+        generated += 1
+
+
+# Puzzle IDs: version of the generator, difficulty letter (upper case when the puzzle was generated
+# to fit the rating band of the same name) and the seed in base 36. An ID only maps to the same
+# puzzle as long as the generator behaves the same, so ID_VERSION changes whenever it does not.
+ID_VERSION = '2'
+ID_LETTERS = {'easy': 'e', 'medium': 'm', 'hard': 'h'}
+_BASE36 = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+
+def puzzle_id(seed, difficulty='easy', rated=False):
+    """
+    :param seed: Non-negative integer seed of the game.
+    :param difficulty: 'easy', 'medium' or 'hard'.
+    :param rated: Whether the game was generated with band=difficulty.
+    :return: Short ID from which the game can be generated again with puzzle_from_id().
+    """
+    if seed < 0:
+        raise ValueError('Puzzle IDs need a non-negative seed.')
+    digits = ''
+    while True:
+        seed, digit = divmod(seed, 36)
+        digits = _BASE36[digit] + digits
+        if not seed:
+            break
+    letter = ID_LETTERS[difficulty]
+    return ID_VERSION + (letter.upper() if rated else letter) + digits
+
+
+def parse_puzzle_id(puzzle_id):
+    """
+    :return: (seed, difficulty, band) encoded in a puzzle ID.
+    :raises ValueError: For an ID that is malformed or made by another generator version.
+    """
+    if len(puzzle_id) < 3 or puzzle_id[0] != ID_VERSION:
+        raise ValueError('Not a version {} puzzle ID: {!r}'.format(ID_VERSION, puzzle_id))
+    difficulty = {letter: name for name, letter in ID_LETTERS.items()}.get(puzzle_id[1].lower())
+    if difficulty is None:
+        raise ValueError('Unknown difficulty in puzzle ID: {!r}'.format(puzzle_id))
+    try:
+        seed = int(puzzle_id[2:], 36)
+    except ValueError:
+        raise ValueError('Malformed seed in puzzle ID: {!r}'.format(puzzle_id)) from None
+    return seed, difficulty, difficulty if puzzle_id[1].isupper() else None
+
+
+@lru_cache(maxsize=1024)
+def puzzle_from_id(puzzle_id):
+    """
+    Generates the game of a puzzle ID again, recently used IDs are served from a cache.
+    :return: (solved, unsolved) flat grids as tuples.
+    """
+    seed, difficulty, band = parse_puzzle_id(puzzle_id)
+    sudoku = Sudoku(seed=seed)
+    sudoku.generate_grid()
+    # the attempts are part of what makes the game reproducible, they must not be cut short
+    sudoku.prepare_grid(difficulty, band)
+    return tuple(sudoku.grid), tuple(sudoku.player_grid)
@@ -0,0 +1,121 @@
+"""
+Compact 81-cell grid with an undo log.
+
+The cells live in one bytearray (81 bytes instead of a list of 81 references
+or 9 nested lists), so copies are a single memcpy and bytes(grid) is a ready
+hash key. Changes made with set() are recorded on a trail and undone in
+reverse order, which replaces copying the whole grid before a tentative
+change and copying it back after.
+"""
+
+
+class Grid:
+    """
+    Flat sudoku grid, cell IDs 0-80 row by row, 0 for a blank.
+    """
+
+    __slots__ = ('cells', 'trail')
+
+    def __init__(self, grid=None):
+        """
+        :param grid: Optional flat iterable of 81 values, 9 rows of 9 values, bytes or a Grid. Empty by default.
+        :raises ValueError: When the grid does not hold 81 cells or a value is not a digit 0-9.
+        """
+        if grid is None:
+            self.cells = bytearray(81)
+        elif isinstance(grid, Grid):
+            self.cells = bytearray(grid.cells)
+        else:
+            if not isinstance(grid, (bytes, bytearray)):
+                grid = list(grid)
+                if len(grid) == 9:
+                    grid = [value for row in grid for value in row]
+            self.cells = bytearray(grid)
+            if len(self.cells) != 81 or max(self.cells) > 9:
+                raise ValueError('Expected 81 cells holding digits 0-9.')
+        self.trail = []  # (cell, previous value) of every set(), oldest first
+
+    def __len__(self):
+        return 81
+
+    def __getitem__(self, index):
+        return self.cells[index]
+
+    def __setitem__(self, cell, value):
+        self.cells[cell] = value
+
+    def __iter__(self):
+        return iter(self.cells)
+
+    def __bytes__(self):
+        return bytes(self.cells)
+
+    def __eq__(self, other):
+        if isinstance(other, Grid):
+            return self.cells == other.cells
+        return NotImplemented
+
+    __hash__ = None  # mutable
+
+    def __repr__(self):
+        return 'Grid({!r})'.format(''.join(map(str, self.cells)))
+
+    def count(self, value):
+        return self.cells.count(value)
+
+    def index(self, value):
+        return self.cells.index(value)
+
+    def copy(self):
+        """
+        :return: Grid with the same cells and an empty trail.
+        """
+        return Grid(self)
+
+    def tolist(self):
+        """
+        :return: Flat list of the 81 cell values.
+        """
+        return list(self.cells)
+
+    def rows(self):
+        """
+        :return: 9 lists of 9 cell values.
+        """
+        return [list(self.cells[row*9: row*9+9]) for row in range(9)]
+
+    def set(self, cell, value):
+        """
+        Changes a cell so that undo() can change it back.
+        """
+        self.trail.append((cell, self.cells[cell]))
+        self.cells[cell] = value
+
+    def mark(self):
+        """
+        :return: Position in the trail to undo() back to.
+        """
+        return len(self.trail)
+
+    def undo(self, mark=0):
+        """
+        Reverts the set() calls made since mark() returned `mark`, all of them by default.
+        """
+        trail = self.trail
+        cells = self.cells
+        while len(trail) > mark:
+            cell, value = trail.pop()
+            cells[cell] = value
+
+    def snapshot(self):
+        """
+        :return: Immutable copy of the cells, to restore() or to use as a key.
+        """
+        return bytes(self.cells)
+
+    def restore(self, snapshot):
+        """
+        Sets all cells from a snapshot() and forgets the trail.
+        """
+        self.cells[:] = snapshot
+        self.trail.clear()
@@ -0,0 +1,244 @@
+"""
+Logical solver: fills a grid the way a person would, using only deductions
+that follow from the rules, so a grid it completes has a single solution.
+
+Candidates are kept as 9-bit masks (see sudoku_engine.candidates). The
+techniques are tried from the simplest one and, as soon as one of them
+changes anything, the search starts over from the simplest one again. A
+technique reports progress through the `changed` flag that every placement
+and elimination sets, so no state is ever copied to detect a fixpoint.
+
+Every technique first collects what it finds over the whole board, from the
+candidates as they stand when its pass starts, and only then places or
+eliminates. A deduction therefore never enables another one later in the
+same pass, and the number of passes (which the rating counts) is the same
+for every relabelling, row and column shuffle or transposition of a grid.
+"""
+
+from itertools import combinations
+
+from sudoku_engine import stats
+from sudoku_engine.candidates import ALL_DIGITS, BIT, DIGITS, POPCOUNT, CandidateMasks
+from sudoku_engine.tables import PEERS, SEGMENTS, UNITS
+
+# in order of difficulty, also the order in which they are tried
+TECHNIQUES = (
+    'hidden single',
+    'naked single',
+    'pointing',
+    'box-line reduction',
+    'naked pair',
+    'hidden pair',
+    'naked triple',
+    'hidden triple',
+)
+
+
+class LogicSolver:
+    """
+    Candidate state of one grid, worked on by the logical techniques.
+    """
+
+    __slots__ = ('grid', 'candidates', 'changed', 'failed', 'steps', 'used')
+
+    def __init__(self, grid):
+        """
+        :param grid: Iterable of 81 cell values (0 for a blank), left untouched.
+        """
+        self.grid = list(grid)
+        self.candidates = [0] * 81
+        self.changed = False
+        self.failed = False
+        self.steps = 0  # successful technique passes
+        self.used = {}  # technique name -> number of successful passes
+
+        try:
+            masks = CandidateMasks(self.grid)
+        except ValueError:
+            self.failed = True
+            return
+        for cell in range(81):
+            if not self.grid[cell]:
+                self.candidates[cell] = masks.candidates(cell)
+                if not self.candidates[cell]:
+                    self.failed = True
+
+    def solve(self):
+        """
+        Applies the techniques until the grid is full or none of them gets any further.
+        :return: True if the grid got completed.
+        """
+        techniques = [(name, getattr(self, name.replace(' ', '_').replace('-', '_'))) for name in TECHNIQUES]
+        while not self.failed and 0 in self.grid:
+            for name, technique in techniques:
+                self.changed = False
+                technique()
+                if self.failed:
+                    return False
+                if self.changed:
+                    self.steps += 1
+                    self.used[name] = self.used.get(name, 0) + 1
+                    break
+            else:
+                return False
+        return not self.failed
+
+    def report(self):
+        # one field per technique, so that stats.Counters adds the passes up technique by technique
+        passes = {name.replace(' ', '_').replace('-', '_'): count for name, count in self.used.items()}
+        stats.emit('logic', steps=self.steps, solved=not self.failed and 0 not in self.grid, **passes)
+
+    def hardest(self):
+        """
+        :return: Name of the hardest technique used so far, None if none was needed.
+        """
+        return max(self.used, key=TECHNIQUES.index, default=None)
+
+    def place(self, cell, digit):
+        bit = BIT[digit]
+        candidates = self.candidates
+        if not candidates[cell] & bit:
+            self.failed = True
+            return
+        self.grid[cell] = digit
+        candidates[cell] = 0
+        self.changed = True
+        for peer in PEERS[cell]:
+            if candidates[peer] & bit:
+                candidates[peer] ^= bit
+                if not candidates[peer] and not self.grid[peer]:
+                    self.failed = True
+
+    def eliminate(self, cells, mask):
+        """
+        Removes the digits of the mask from the candidates of the cells.
+        """
+        candidates = self.candidates
+        for cell in cells:
+            if candidates[cell] & mask:
+                candidates[cell] &= ~mask
+                self.changed = True
+                if not candidates[cell]:
+                    self.failed = True
+
+    def eliminate_all(self, eliminations):
+        """
+        Applies the (cells, mask) eliminations a technique found in one pass over the units.
+        """
+        for cells, mask in eliminations:
+            self.eliminate(cells, mask)
+
+    def naked_single(self):
+        candidates = self.candidates
+        singles = [(cell, DIGITS[mask][0]) for cell, mask in enumerate(candidates) if mask and POPCOUNT[mask] == 1]
+        for cell, digit in singles:
+            self.place(cell, digit)
+
+    def hidden_single(self):
+        candidates, grid = self.candidates, self.grid
+        singles = []
+        for unit in UNITS:
+            once = twice = placed = 0
+            for cell in unit:
+                mask = candidates[cell]
+                twice |= once & mask
+                once |= mask
+                placed |= BIT[grid[cell]]
+            if (once | placed) != ALL_DIGITS:
+                # some digit has no place left in this unit
+                self.failed = True
+                return
+            for digit in DIGITS[once & ~twice]:
+                bit = BIT[digit]
+                for cell in unit:
+                    if candidates[cell] & bit:
+                        singles.append((cell, digit))
+                        break
+        for cell, digit in singles:
+            if grid[cell] != digit:
+                self.place(cell, digit)
+
+    def pointing(self):
+        candidates = self.candidates
+        eliminations = []
+        for segment, line_rest, box_rest in SEGMENTS:
+            inside = candidates[segment[0]] | candidates[segment[1]] | candidates[segment[2]]
+            elsewhere_in_box = 0
+            for cell in box_rest:
+                elsewhere_in_box |= candidates[cell]
+            # digits that can only go to this segment of the box leave the rest of the line
+            if inside & ~elsewhere_in_box:
+                eliminations.append((line_rest, inside & ~elsewhere_in_box))
+        self.eliminate_all(eliminations)
+
+    def box_line_reduction(self):
+        candidates = self.candidates
+        eliminations = []
+        for segment, line_rest, box_rest in SEGMENTS:
+            inside = candidates[segment[0]] | candidates[segment[1]] | candidates[segment[2]]
+            elsewhere_in_line = 0
+            for cell in line_rest:
+                elsewhere_in_line |= candidates[cell]
+            # digits that can only go to this segment of the line leave the rest of the box
+            if inside & ~elsewhere_in_line:
+                eliminations.append((box_rest, inside & ~elsewhere_in_line))
+        self.eliminate_all(eliminations)
+
+    def _naked_subsets(self, size):
+        candidates = self.candidates
+        eliminations = []
+        for unit in UNITS:
+            cells = [cell for cell in unit if 2 <= POPCOUNT[candidates[cell]] <= size]
+            for subset in combinations(cells, size):
+                mask = 0
+                for cell in subset:
+                    mask |= candidates[cell]
+                if POPCOUNT[mask] == size:
+                    eliminations.append(([cell for cell in unit if cell not in subset], mask))
+        self.eliminate_all(eliminations)
+
+    def _hidden_subsets(self, size):
+        candidates = self.candidates
+        eliminations = []
+        for unit in UNITS:
+            # positions (bits over the unit's cells) every unplaced digit can still take
+            positions = {}
+            for index, cell in enumerate(unit):
+                for digit in DIGITS[candidates[cell]]:
+                    positions[digit] = positions.get(digit, 0) | 1 << index
+            digits = [digit for digit, where in positions.items() if POPCOUNT[where] <= size]
+            for subset in combinations(digits, size):
+                where = 0
+                for digit in subset:
+                    where |= positions[digit]
+                if POPCOUNT[where] == size:
+                    keep = 0
+                    for digit in subset:
+                        keep |= BIT[digit]
+                    eliminations.append(([cell for index, cell in enumerate(unit) if where >> index & 1],
+                                         ALL_DIGITS & ~keep))
+        self.eliminate_all(eliminations)
+
+    def naked_pair(self):
+        self._naked_subsets(2)
+
+    def hidden_pair(self):
+        self._hidden_subsets(2)
+
+    def naked_triple(self):
+        self._naked_subsets(3)
+
+    def hidden_triple(self):
+        self._hidden_subsets(3)
+
+
+def logic_solve(grid):
+    """
+    :param grid: Iterable of 81 cell values (0 for a blank).
+    :return: The LogicSolver after solve(); its grid is complete when the logic was enough.
+    """
+    solver = LogicSolver(grid)
+    solver.solve()
+    if stats.enabled:
+        solver.report()
+    return solver
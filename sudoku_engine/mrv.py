@@ -0,0 +1,173 @@
+"""
+Most-constrained-cell-first search with forward checking.
+
+Every blank cell keeps its own candidate mask. Placing a digit strips it from
+the peers' masks (failing as soon as a peer runs out of candidates) and
+places every peer left with a single candidate right away. All mask changes
+go to a trail, so backtracking restores the exact previous state without
+recomputing anything, and the next cell to branch on is picked from the
+stored masks of the cells that were blank when the search started.
+"""
+
+from sudoku_engine import stats
+from sudoku_engine.candidates import BIT, DIGITS, POPCOUNT, CandidateMasks
+from sudoku_engine.tables import PEERS
+
+
+class PropagatingSearch:
+    """
+    Search state of one grid. An instance is consumed by a single search.
+    """
+
+    __slots__ = ('grid', 'candidates', 'blanks', 'trail', 'placed', 'failed', 'nodes', 'backtracks', 'propagations')
+
+    def __init__(self, grid):
+        """
+        :param grid: Iterable of 81 cell values (0 for a blank), left untouched.
+        """
+        self.grid = list(grid)
+        self.candidates = [0] * 81
+        self.blanks = []  # cells left blank once the givens and their singles are placed
+        self.trail = []  # (cell, mask before the change)
+        self.placed = []  # cells filled in by the search, in order
+        self.failed = False
+        self.nodes = 0  # branches tried
+        self.backtracks = 0  # branches that led to a contradiction
+        self.propagations = 0  # digits placed because they were the last candidate of a cell
+
+        try:
+            masks = CandidateMasks(self.grid)
+        except ValueError:
+            self.failed = True
+            return
+
+        singles = []
+        for cell in range(81):
+            if not self.grid[cell]:
+                mask = masks.candidates(cell)
+                if not mask:
+                    self.failed = True
+                    return
+                self.candidates[cell] = mask
+                if POPCOUNT[mask] == 1:
+                    singles.append((cell, DIGITS[mask][0]))
+        self.failed = not self.assign(singles)
+        self.propagations = len(self.placed)
+        self.blanks = [cell for cell in range(81) if self.candidates[cell]]
+
+    def assign(self, queue):
+        """
+        Places digits and propagates naked singles until nothing is left to place.
+        :param queue: List of (cell, digit) to place, consumed by the call.
+        :return: False when a contradiction came up, the state then has to be undone.
+        """
+        grid, candidates, trail, placed = self.grid, self.candidates, self.trail, self.placed
+        while queue:
+            cell, digit = queue.pop()
+            bit = BIT[digit]
+            if not candidates[cell] & bit:
+                # already filled, or the digit was taken by a peer meanwhile
+                if grid[cell] == digit:
+                    continue
+                return False
+
+            trail.append((cell, candidates[cell]))
+            candidates[cell] = 0
+            grid[cell] = digit
+            placed.append(cell)
+
+            for peer in PEERS[cell]:
+                mask = candidates[peer]
+                if mask & bit:
+                    trail.append((peer, mask))
+                    mask ^= bit
+                    candidates[peer] = mask
+                    if not mask:
+                        return False
+                    if POPCOUNT[mask] == 1:
+                        queue.append((peer, DIGITS[mask][0]))
+        return True
+
+    def undo(self, trail_mark, placed_mark):
+        grid, candidates, trail, placed = self.grid, self.candidates, self.trail, self.placed
+        while len(trail) > trail_mark:
+            cell, mask = trail.pop()
+            candidates[cell] = mask
+        while len(placed) > placed_mark:
+            grid[placed.pop()] = 0
+
+    def most_constrained(self):
+        """
+        Scans the cells that were blank when the search started and stops at the first one with two
+        candidates. Most nodes have such a cell early on, but a node without one scans all of them,
+        however few are still blank. Bucketing the cells by candidate count would bound that, at the
+        price of an update on every mask change in assign() and undo(), where the time already goes.
+        :return: Blank cell with the fewest candidates, or None when the grid is full.
+        """
+        candidates = self.candidates
+        best, best_count = None, 10
+        for cell in self.blanks:
+            mask = candidates[cell]
+            if mask and POPCOUNT[mask] < best_count:
+                best, best_count = cell, POPCOUNT[mask]
+                # singles are placed on the spot, so two candidates is the minimum
+                if best_count == 2:
+                    break
+        return best
+
+    def search(self):
+        """
+        Yields every solution as a flat list of 81 digits.
+        """
+        if self.failed:
+            return
+
+        cell = self.most_constrained()
+        if cell is None:
+            yield list(self.grid)
+            return
+
+        for digit in DIGITS[self.candidates[cell]]:
+            trail_mark, placed_mark = len(self.trail), len(self.placed)
+            self.nodes += 1
+            assigned = self.assign([(cell, digit)])
+            # everything placed after the branch digit itself was propagated
+            self.propagations += len(self.placed) - placed_mark - 1
+            if assigned:
+                yield from self.search()
+            else:
+                self.backtracks += 1
+            self.undo(trail_mark, placed_mark)
+
+    def report(self, solutions):
+        stats.emit('search', backend='mrv', nodes=self.nodes, backtracks=self.backtracks,
+                   propagations=self.propagations, solutions=solutions)
+
+
+def iter_solutions(grid):
+    """
+    Yields every solution of a grid as a flat list of 81 digits.
+    """
+    search = PropagatingSearch(grid)
+    if not stats.enabled:
+        return search.search()
+    return stats.counted(search.search(), search.report)
+
+
+def solve(grid):
+    """
+    :return: A solution of the grid as a flat list of 81 digits, or None if there is none.
+    """
+    return next(iter_solutions(grid), None)
+
+
+def count_solutions(grid, limit=2):
+    """
+    :return: Number of solutions of the grid, at most `limit`.
+    """
+    found = 0
+    for _ in iter_solutions(grid):
+        found += 1
+        if found >= limit:
+            break
+    return found
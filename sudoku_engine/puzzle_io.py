@@ -0,0 +1,86 @@
+"""
+Streaming reader and writer for the one-puzzle-per-line format: 81 characters
+in row-major order, digits for the givens and '.' or '0' for the blanks.
+
+Both work on generators, so puzzle files of any size are processed one line
+at a time, e.g.:
+
+    write_puzzles('solved.txt', solve(grid) for grid in read_puzzles('puzzles.txt'))
+"""
+
+from contextlib import contextmanager
+
+BLANKS = '.0'
+
+
+def parse_line(line):
+    """
+    :param line: Puzzle line; anything after the first whitespace (ratings, comments...) is ignored.
+    :return: Flat list of the 81 cell values (0 for a blank).
+    :raises ValueError: When the line does not start with 81 digits or blanks.
+    """
+    token = line.split(None, 1)[0] if line.strip() else ''
+    if len(token) != 81:
+        raise ValueError('Expected 81 cells, got {}: {!r}'.format(len(token), token))
+    try:
+        return [0 if char in BLANKS else int(char) for char in token]
+    except ValueError:
+        raise ValueError('Unexpected character in puzzle line: {!r}'.format(token)) from None
+
+
+def format_line(grid, blank='.'):
+    """
+    :param grid: Flat list of 81 values or 9 rows of 9 values (0 for a blank).
+    :param blank: Character written for the blank cells, '.' or '0'.
+    :return: The 81-character line, without the trailing newline.
+    """
+    if len(grid) == 9:
+        grid = [value for row in grid for value in row]
+    return ''.join(str(value) if value else blank for value in grid)
+
+
+@contextmanager
+def _open(target, mode):
+    if isinstance(target, (str, bytes)) or hasattr(target, '__fspath__'):
+        with open(target, mode) as file:
+            yield file
+    else:
+        yield target
+
+
+def read_puzzles(source, malformed='raise'):
+    """
+    Yields the puzzles of a file one at a time, skipping empty lines and '#' comments.
+    :param source: Path or text file object.
+    :param malformed: 'raise' to stop at a malformed line, 'keep' to yield its ValueError in place
+        of the puzzle, so that a batch can report it and carry on.
+    :return: Generator of flat lists of 81 values.
+    :raises ValueError: On a malformed line, reporting its line number.
+    """
+    with _open(source, 'r') as file:
+        for number, line in enumerate(file, 1):
+            if not line.strip() or line.lstrip().startswith('#'):
+                continue
+            try:
+                yield parse_line(line)
+            except ValueError as error:
+                error = ValueError('Line {}: {}'.format(number, error))
+                if malformed != 'keep':
+                    raise error from None
+                yield error
+
+
+def write_puzzles(target, grids, blank='.'):
+    """
+    Writes puzzles one per line as they come from the iterable.
+    :param target: Path or text file object.
+    :param grids: Iterable of flat or nested grids.
+    :param blank: Character written for the blank cells.
+    :return: Number of puzzles written.
+    """
+    written = 0
+    with _open(target, 'w') as file:
+        for grid in grids:
+            file.write(format_line(grid, blank) + '\n')
+            written += 1
+    return written
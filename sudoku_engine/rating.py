@@ -0,0 +1,69 @@
+"""
+Difficulty rating based on the techniques the logical solver needs.
+
+A puzzle is worth the weight of the hardest technique it requires plus a
+hundredth per technique pass, so among puzzles that need the same technique
+the ones taking more rounds of deductions rate higher. Puzzles the logical
+solver cannot finish rate infinitely high.
+"""
+
+from collections import namedtuple
+
+from sudoku_engine.logic import logic_solve
+
+# score - the rating, hardest - name of the hardest technique needed (None for a full grid),
+# steps - number of successful technique passes, solved - whether logic alone completed the grid
+Rating = namedtuple('Rating', ['score', 'hardest', 'steps', 'solved'])
+
+WEIGHTS = {
+    None: 0.0,
+    'hidden single': 1.2,
+    'naked single': 2.3,
+    'pointing': 2.6,
+    'box-line reduction': 2.8,
+    'naked pair': 3.0,
+    'hidden pair': 3.4,
+    'naked triple': 3.6,
+    'hidden triple': 4.0,
+}
+
+# (lowest, highest) score of every difficulty: easy takes a few rounds of hidden singles,
+# medium needs naked singles or many rounds, hard needs at least the pointing technique
+RATING_BANDS = {
+    'easy': (0.0, 1.29),
+    'medium': (1.3, 2.59),
+    'hard': (2.6, 9.99),
+}
+
+
+def rating_of(solver):
+    """
+    :param solver: LogicSolver after its solve() run.
+    :return: Rating of the grid the solver started from.
+    """
+    solved = not solver.failed and 0 not in solver.grid
+    hardest = solver.hardest()
+    score = WEIGHTS[hardest] + solver.steps / 100 if solved else float('inf')
+    return Rating(score, hardest, solver.steps, solved)
+
+
+def rate(grid):
+    """
+    :param grid: Iterable of 81 cell values (0 for a blank).
+    :return: Rating of the puzzle.
+    """
+    return rating_of(logic_solve(grid))
+
+
+def get_band(band):
+    """
+    :param band: Name from RATING_BANDS or a (lowest, highest) score pair.
+    :return: The (lowest, highest) score pair.
+    """
+    if isinstance(band, str):
+        try:
+            return RATING_BANDS[band]
+        except KeyError:
+            raise ValueError('Unknown rating band {!r}, expected one of {}.'.format(
+                band, tuple(RATING_BANDS))) from None
+    return tuple(band)
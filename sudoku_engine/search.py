@@ -0,0 +1,125 @@
+"""
+Exhaustive searches over flat 81-cell grids (0 for a blank).
+
+Every entry point takes a `backend` argument:
+ - 'backtrack' - row-major backtracking over the candidate masks,
+ - 'mrv' - most-constrained cell first, with forward checking and naked singles (see sudoku_engine.mrv),
+ - 'dlx' - exact cover with Dancing Links (see sudoku_engine.dlx), much faster on hard puzzles.
+"""
+
+from importlib import import_module
+
+from sudoku_engine import stats
+from sudoku_engine.candidates import CandidateMasks
+
+BACKENDS = ('backtrack', 'mrv', 'dlx')
+# imported on first use, building the Dancing Links matrix is not free
+_MODULES = {'mrv': 'sudoku_engine.mrv', 'dlx': 'sudoku_engine.dlx'}
+
+
+def _check_backend(backend):
+    if backend not in BACKENDS:
+        raise ValueError('Unknown solver backend {!r}, expected one of {}.'.format(backend, BACKENDS))
+
+
+def solve(grid, backend='backtrack'):
+    """
+    :param grid: Iterable of 81 cell values, left untouched.
+    :param backend: Search algorithm to use, one of BACKENDS.
+    :return: A solution of the grid as a flat list of 81 digits, or None if there is none.
+    """
+    return next(iter_solutions(grid, backend), None)
+
+
+def iter_solutions(grid, backend='backtrack'):
+    """
+    Yields every solution of a grid as a flat list of 81 digits.
+    :param grid: Iterable of 81 cell values, left untouched.
+    :param backend: Search algorithm to use, one of BACKENDS.
+    """
+    _check_backend(backend)
+    if backend in _MODULES:
+        return import_module(_MODULES[backend]).iter_solutions(grid)
+
+    grid = list(grid)
+    try:
+        masks = CandidateMasks(grid)
+    except ValueError:
+        return iter(())
+    empty = [cell for cell in range(81) if not grid[cell]]
+    counters = [0, 0]
+    solutions = _iterate(grid, masks, empty, 0, counters)
+    if stats.enabled:
+        solutions = stats.counted(solutions, lambda found: _report(counters, found))
+    return solutions
+
+
+def count_solutions(grid, limit=2, backend='backtrack'):
+    """
+    Counts the solutions of a grid, stopping as soon as `limit` of them are found.
+    The search is deterministic, so count_solutions(grid) == 1 proves the solution is unique.
+    :param grid: Iterable of 81 cell values, left untouched.
+    :param limit: Number of solutions after which the search stops.
+    :param backend: Search algorithm to use, one of BACKENDS.
+    :return: Number of solutions found, at most `limit`.
+    """
+    _check_backend(backend)
+    if backend in _MODULES:
+        return import_module(_MODULES[backend]).count_solutions(grid, limit)
+
+    grid = list(grid)
+    try:
+        masks = CandidateMasks(grid)
+    except ValueError:
+        return 0
+    empty = [cell for cell in range(81) if not grid[cell]]
+    counters = [0, 0]
+    found = _count(masks, empty, 0, limit, counters)
+    if stats.enabled:
+        _report(counters, found)
+    return found
+
+
+def _report(counters, found):
+    stats.emit('search', backend='backtrack', nodes=counters[0], backtracks=counters[1], propagations=0,
+               solutions=found)
+
+
+# counters: [digits tried, cells found without any candidate left]
+def _count(masks, empty, index, limit, counters):
+    if index == len(empty):
+        return 1
+
+    cell = empty[index]
+    digits = masks.digits(cell)
+    if not digits:
+        counters[1] += 1
+        return 0
+    found = 0
+    for digit in digits:
+        counters[0] += 1
+        masks.place(cell, digit)
+        found += _count(masks, empty, index+1, limit-found, counters)
+        masks.unplace(cell, digit)
+        if found >= limit:
+            break
+    return found
+
+
+def _iterate(grid, masks, empty, index, counters):
+    if index == len(empty):
+        yield list(grid)
+        return
+
+    cell = empty[index]
+    digits = masks.digits(cell)
+    if not digits:
+        counters[1] += 1
+        return
+    for digit in digits:
+        counters[0] += 1
+        grid[cell] = digit
+        masks.place(cell, digit)
+        yield from _iterate(grid, masks, empty, index+1, counters)
+        masks.unplace(cell, digit)
+    grid[cell] = 0
@@ -0,0 +1,417 @@
+"""
+Local puzzle service speaking JSON lines over TCP or a Unix socket:
+
+    python -m sudoku_engine serve --port 8765 -j 4
+
+Every request is a JSON object on one line and gets one JSON line back:
+
+ - {"op": "solve", "grid": "3.65.84..52......"} -> {"solution": "3165784..."}
+   (the grid may also be a list of 81 values, "backend" picks the search);
+ - {"op": "rate", "grid": ...} -> {"score", "hardest", "steps", "solved"},
+   the score is null when logic alone cannot solve the puzzle;
+ - {"op": "generate", "difficulty": "hard"} -> {"puzzle", "solution", "puzzle_id"},
+   "rated": true for a puzzle generated to fit the rating band of its difficulty,
+   {"op": "generate", "puzzle_id": "2h2s"} to generate a known game again;
+ - {"op": "stats"} -> counters of the service.
+
+A request may carry an "id", echoed in its response, and a "timeout" in
+seconds. Failures are answered with {"id": ..., "error": <message>}. The
+responses of a connection come in completion order, so clients pipelining
+their requests match them up by id. The workers stop generating a game at
+the deadline of its request, so a game that takes too long gives its worker
+back instead of holding it after the request timed out.
+
+The event loop only parses and routes requests, the work runs in a process
+pool. Solve and rate requests arriving within `batch_delay` of each other go
+to a worker together, up to `batch_size` at once, so one round trip to the
+pool serves the whole batch, and solutions are kept in an LRUCache. Unrated
+games come from a warm queue per difficulty that the pool keeps topped up in
+the background, with at most half of the workers, so a generate request is
+answered without waiting for the generator.
+
+Backpressure: at most `max_pending` requests are in progress over all
+connections. Beyond that the server stops reading from the sockets, and the
+clients' writes block instead of queues growing in the server. At most
+2 * `workers` batches are handed to the pool at once.
+"""
+
+import asyncio
+import json
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from random import Random
+from time import time
+
+from sudoku_engine.bank import DIFFICULTIES
+from sudoku_engine.batch import NO_SOLUTION_ERROR, solve_job, start_trace
+from sudoku_engine.cache import NO_SOLUTION, LRUCache, solution_key
+from sudoku_engine.generator import GenerationTimeout, generate, parse_puzzle_id, puzzle_id
+from sudoku_engine.puzzle_io import format_line, parse_line
+from sudoku_engine.rating import rate
+from sudoku_engine.search import BACKENDS
+
+
+class RequestError(ValueError):
+    """
+    Malformed request, answered with its message.
+    """
+
+
+def _solve_batch(jobs):
+    return [solve_job(job) for job in jobs]
+
+
+def _rate_batch(grids):
+    ratings = []
+    for grid in grids:
+        try:
+            ratings.append(rate(grid))
+        except Exception as error:  # a failing grid must not take the whole batch down
+            ratings.append('{}: {}'.format(type(error).__name__, error))
+    return ratings
+
+
+def _generate_seeded(difficulty, rated, seed, deadline=None):
+    """
+    Generates a game, giving up at the deadline.
+    :param deadline: Optional time.time() value, shared by the service and its workers.
+    :return: (solved, unsolved, puzzle ID), or the error message when the deadline passed.
+    """
+    # a game that gets ready in time is the one generating without a deadline gives, IDs stay valid
+    timeout = None if deadline is None else max(0.0, deadline - time())
+    try:
+        result = generate(difficulty, difficulty if rated else None, timeout, accept_partial=False, seed=seed)
+    except GenerationTimeout as error:  # not sent back as such, the exception does not pickle
+        return str(error)
+    return result.solved, result.unsolved, puzzle_id(seed, difficulty, rated)
+
+
+def _regenerate(game_id, deadline=None):
+    seed, difficulty, band = parse_puzzle_id(game_id)
+    return _generate_seeded(difficulty, band is not None, seed, deadline)
+
+
+def _parse_grid(request):
+    grid = request.get('grid')
+    if isinstance(grid, str):
+        return parse_line(grid)
+    if not isinstance(grid, list) or len(grid) != 81:
+        raise RequestError('Expected "grid": an 81-character line or a list of 81 values.')
+    if not all(isinstance(value, int) and 0 <= value <= 9 for value in grid):
+        raise RequestError('Grid values have to be digits 0-9.')
+    return grid
+
+
+def _game(game):
+    if isinstance(game, str):
+        return {'error': game}
+    solved, unsolved, game_id = game
+    return {'puzzle': format_line(unsolved), 'solution': format_line(solved), 'puzzle_id': game_id}
+
+
+class _Batcher:
+    """
+    Collects the jobs of one kind and runs them through the pool in batches.
+    """
+
+    def __init__(self, service, function):
+        self.service = service
+        self.function = function
+        self.queue = asyncio.Queue()  # (job, future); bounded by the service's pending requests
+        self.running = set()
+
+    async def submit(self, job):
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((job, future))
+        return await future
+
+    async def run(self):
+        service = self.service
+        while True:
+            batch = [await self.queue.get()]
+            if self.queue.qsize() < service.batch_size - 1:
+                # give the requests arriving right behind this one the chance to join it
+                await asyncio.sleep(service.batch_delay)
+            while len(batch) < service.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            # requests that timed out meanwhile are not worth a worker's time
+            batch = [(job, future) for job, future in batch if not future.done()]
+            if not batch:
+                continue
+            await service.batch_slots.acquire()
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self.running.add(task)
+            task.add_done_callback(self.running.discard)
+
+    async def _run_batch(self, batch):
+        service = self.service
+        service.counters['batches'] += 1
+        service.counters['batched'] += len(batch)
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                service.pool, self.function, [job for job, _ in batch])
+        except Exception as error:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+        else:
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            service.batch_slots.release()
+
+
+class PuzzleService:
+    """
+    Request handling and the worker pool behind listen(), used as an async context manager:
+
+        async with PuzzleService(workers=4) as service:
+            server = await service.listen(port=8765)
+            await server.serve_forever()
+    """
+
+    def __init__(self, workers=None, batch_size=64, batch_delay=0.002, max_pending=1024, timeout=10.0,
+                 warm_size=16, cache_size=100000, trace=None):
+        """
+        :param workers: Number of worker processes, os.cpu_count() by default.
+        :param batch_size: Largest number of solve or rate requests sent to a worker at once.
+        :param batch_delay: Seconds a request waits for others to join its batch.
+        :param max_pending: Number of requests in progress beyond which the sockets are no longer read.
+        :param timeout: Default seconds after which a request is answered with an error.
+        :param warm_size: Games kept ready per difficulty, 0 to generate every game on request.
+        :param cache_size: Solutions kept in memory, 0 for no cache.
+        :param trace: Optional path of a file the workers append their stats events to, as JSON lines.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.warm_size = warm_size
+        self.cache = LRUCache(cache_size) if cache_size else None
+        self.trace = trace
+        self.counters = Counter()
+        self.rng = Random()
+        self.pool = None
+        self.tasks = []
+        self.connections = set()  # tasks of the handle() calls in progress
+
+    async def start(self):
+        self.pool = ProcessPoolExecutor(self.workers, initializer=start_trace if self.trace else None,
+                                        initargs=(self.trace,) if self.trace else ())
+        self.pending = asyncio.Semaphore(self.max_pending)
+        self.batch_slots = asyncio.Semaphore(2 * self.workers)
+        self.solver = _Batcher(self, _solve_batch)
+        self.rater = _Batcher(self, _rate_batch)
+        self.tasks = [asyncio.ensure_future(self.solver.run()), asyncio.ensure_future(self.rater.run())]
+
+        self.warm = {difficulty: asyncio.Queue() for difficulty in DIFFICULTIES}
+        self.filling = Counter()  # difficulty -> games being generated for its warm queue
+        self.taken = asyncio.Event()  # set whenever a game leaves a warm queue
+        if self.warm_size:
+            self.tasks += [asyncio.ensure_future(self._fill()) for _ in range(max(1, self.workers // 2))]
+
+    async def close(self):
+        # connections first, their requests may wait on the tasks below
+        for task in self.connections:
+            task.cancel()
+        await asyncio.gather(*self.connections, return_exceptions=True)
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+        return False
+
+    async def listen(self, host='127.0.0.1', port=8765, path=None):
+        """
+        :param path: Path of a Unix socket to listen on instead of host and port.
+        :return: The asyncio Server.
+        """
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle, path)
+        return await asyncio.start_server(self.handle, host, port)
+
+    def _call(self, function, *args):
+        return asyncio.get_running_loop().run_in_executor(self.pool, partial(function, *args))
+
+    async def _fill(self):
+        """
+        Keeps the warm queues topped up, generating for the emptiest one first.
+        """
+        while True:
+            difficulty = min(DIFFICULTIES, key=lambda name: self.warm[name].qsize() + self.filling[name])
+            if self.warm[difficulty].qsize() + self.filling[difficulty] >= self.warm_size:
+                self.taken.clear()
+                await self.taken.wait()
+                continue
+            self.filling[difficulty] += 1
+            deadline = None if self.timeout is None else time() + self.timeout
+            try:
+                game = await self._call(_generate_seeded, difficulty, False, self.rng.getrandbits(48), deadline)
+            finally:
+                self.filling[difficulty] -= 1
+            if isinstance(game, str):  # out of time, the next round tries another seed
+                self.counters['fill_timeouts'] += 1
+                continue
+            self.warm[difficulty].put_nowait(game)
+
+    async def handle(self, reader, writer):
+        """
+        Serves one connection: every request line is answered by a task of its own.
+        """
+        lock = asyncio.Lock()  # one drain() at a time
+        tasks = set()
+        connection = asyncio.current_task()
+        self.connections.add(connection)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):  # line over the stream limit, or the client went away
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                # backpressure: no reading while too many requests are in progress
+                await self.pending.acquire()
+                task = asyncio.ensure_future(self._respond(line, writer, lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks, return_exceptions=True)
+        except asyncio.CancelledError:
+            # shutting down: the handler ends normally, asyncio's stream callback reports
+            # cancelled handlers as errors on Python 3.11
+            for task in tasks:
+                task.cancel()
+        finally:
+            self.connections.discard(connection)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, asyncio.CancelledError):
+                pass
+
+    async def _respond(self, line, writer, lock):
+        request_id = None
+        try:
+            self.counters['requests'] += 1
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise RequestError('Expected a JSON object.')
+                request_id = request.get('id')
+                timeout = request.get('timeout', self.timeout)
+                if timeout is not None and (isinstance(timeout, bool) or not isinstance(timeout, (int, float))
+                                            or timeout <= 0):
+                    raise RequestError('"timeout" has to be a positive number of seconds.')
+                deadline = None if timeout is None else time() + timeout
+                response = await asyncio.wait_for(self.dispatch(request, deadline), timeout)
+            except asyncio.TimeoutError:
+                self.counters['timeouts'] += 1
+                response = {'error': 'Timed out after {} s.'.format(timeout)}
+            except ValueError as error:  # RequestError, bad JSON or a bad grid line
+                response = {'error': str(error)}
+            except Exception as error:
+                response = {'error': '{}: {}'.format(type(error).__name__, error)}
+            if 'error' in response:
+                self.counters['errors'] += 1
+            response['id'] = request_id
+            writer.write((json.dumps(response) + '\n').encode())
+            async with lock:
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.pending.release()
+
+    async def dispatch(self, request, deadline=None):
+        """
+        :param deadline: Optional time.time() value after which the workers give up generating.
+        :return: Response dict of a request, without its id.
+        :raises ValueError: For a malformed request.
+        """
+        op = request.get('op')
+        if op == 'solve':
+            return await self.solve(_parse_grid(request), request.get('backend', 'mrv'))
+        if op == 'rate':
+            rating = await self.rater.submit(_parse_grid(request))
+            if isinstance(rating, str):
+                return {'error': rating}
+            return {'score': rating.score if rating.solved else None, 'hardest': rating.hardest,
+                    'steps': rating.steps, 'solved': rating.solved}
+        if op == 'generate':
+            if 'puzzle_id' in request:
+                return _game(await self._call(_regenerate, str(request['puzzle_id']), deadline))
+            return _game(await self.generate(request.get('difficulty', 'easy'), bool(request.get('rated')), deadline))
+        if op == 'stats':
+            return self.stats()
+        raise RequestError('Unknown op {!r}, expected solve, rate, generate or stats.'.format(op))
+
+    async def solve(self, grid, backend='mrv'):
+        if backend not in BACKENDS:
+            raise RequestError('Unknown backend {!r}, expected one of {}.'.format(backend, BACKENDS))
+        cells = bytes(grid)
+        key = solution_key(cells)
+        value = self.cache.get(key) if self.cache is not None else None
+        if value is None:
+            result = await self.solver.submit((0, cells, False, backend))
+            if self.cache is not None and (result.solution is not None or result.error == NO_SOLUTION_ERROR):
+                self.cache.put(key, NO_SOLUTION if result.solution is None else bytes(result.solution))
+            if result.error:
+                return {'error': result.error}
+            return {'solution': format_line(result.solution)}
+        if value == NO_SOLUTION:
+            return {'error': NO_SOLUTION_ERROR}
+        return {'solution': format_line(value)}
+
+    async def generate(self, difficulty='easy', rated=False, deadline=None):
+        """
+        :param deadline: Optional time.time() value after which the worker gives up generating.
+        :return: (solved, unsolved, puzzle ID) of a new game, from the warm queue when there is one,
+            or the error message when the deadline passed.
+        """
+        if difficulty not in DIFFICULTIES:
+            raise RequestError('Unknown difficulty {!r}, expected one of {}.'.format(difficulty, DIFFICULTIES))
+        if rated or not self.warm_size:
+            return await self._call(_generate_seeded, difficulty, rated, self.rng.getrandbits(48), deadline)
+        if self.warm[difficulty].empty():
+            self.counters['warm_misses'] += 1
+        game = await self.warm[difficulty].get()
+        self.taken.set()
+        return game
+
+    def stats(self):
+        """
+        :return: JSON-serialisable dict of the request, batch and cache counters.
+        """
+        stats = dict(self.counters)
+        stats['mean_batch'] = self.counters['batched'] / self.counters['batches'] if self.counters['batches'] else 0.0
+        stats['warm'] = {difficulty: queue.qsize() for difficulty, queue in self.warm.items()}
+        stats['cache'] = self.cache.stats() if self.cache is not None else None
+        return stats
+
+
+async def serve(host='127.0.0.1', port=8765, path=None, **options):
+    """
+    Runs a PuzzleService until cancelled.
+    :param options: Keyword arguments of PuzzleService.
+    """
+    async with PuzzleService(**options) as service:
+        server = await service.listen(host, port, path)
+        async with server:
+            address = path or '{}:{}'.format(*server.sockets[0].getsockname()[:2])
+            sys.stderr.write('serving on {}\n'.format(address))
+            sys.stderr.flush()
+            await server.serve_forever()
@@ -0,0 +1,190 @@
+"""
+Opt-in instrumentation of the solvers, the generator and the GUI.
+
+Instrumented code reports events, plain dicts with an 'event' name and
+numeric or string fields, to the sinks installed in this process. A sink is
+any callable taking such a dict: a function, a Counters instance that adds
+the events up in memory or a JsonLinesSink that appends them to a file.
+
+While no sink is installed, `enabled` is False and the instrumented code
+skips building events altogether, so the cost is one attribute check per
+solve or phase. Importing the module is nearly free as well: what the sinks
+need (json, collections) is only imported when one is created. Sinks are per
+process: the workers of a process pool report to the sinks installed in them,
+not to those of the parent.
+
+Events:
+ - search: backend, nodes (branches tried), backtracks (branches that failed),
+   propagations (digits placed by propagation), solutions;
+ - logic: steps (successful technique passes), solved and the passes of every
+   technique used, one field each (hidden_single, pointing, naked_pair...);
+ - fill: nodes (digits tried), backtracks (digits taken back) - the search
+   filling in a new solution grid in generate_grid();
+ - phase: phase ('generate_grid', 'remove_values', 'single_solution_check'),
+   elapsed (seconds) and the outcome of the phase;
+ - removal_check: cached (verdict taken from the cache), forced (decided by the
+   forced-placement shortcut), verdict;
+ - attempt: attempt (number), difficulty - one per remove_values() run of prepare_grid();
+ - the GUI reports move, undo, hint and note_mode events with the field and digits involved
+   (Sudoku.py installs a JsonLinesSink when SUDOKU_TRACE names a file).
+"""
+
+from time import perf_counter
+
+enabled = False
+_sinks = []
+
+
+def add_sink(sink):
+    """
+    :param sink: Callable taking an event dict.
+    """
+    global enabled
+    _sinks.append(sink)
+    enabled = True
+
+
+def remove_sink(sink):
+    global enabled
+    _sinks.remove(sink)
+    enabled = bool(_sinks)
+
+
+class _Recording:
+    __slots__ = ('sink',)
+
+    def __init__(self, sink):
+        self.sink = sink
+
+    def __enter__(self):
+        add_sink(self.sink)
+        return self.sink
+
+    def __exit__(self, *exc_info):
+        remove_sink(self.sink)
+        return False
+
+
+def recording(sink=None):
+    """
+    Installs a sink for the duration of a with block.
+    :param sink: Callable taking an event dict, a new Counters by default.
+    :return: Context manager returning the sink.
+    """
+    return _Recording(Counters() if sink is None else sink)
+
+
+def emit(event, **fields):
+    """
+    Hands an event to every installed sink. Callers check `enabled` first.
+    """
+    fields['event'] = event
+    for sink in _sinks:
+        sink(fields)
+
+
+def counted(solutions, report):
+    """
+    Passes solutions through and calls report(number of solutions yielded) once they run out
+    or the consumer drops them, e.g. after taking the first one.
+    """
+    found = 0
+    try:
+        for solution in solutions:
+            found += 1
+            yield solution
+    finally:
+        report(found)
+
+
+class _Phase:
+    __slots__ = ('name', 'fields', 'start')
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = fields
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self.fields
+
+    def __exit__(self, *exc_info):
+        emit('phase', phase=self.name, elapsed=perf_counter() - self.start, **self.fields)
+        return False
+
+
+class _NoPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return {}
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NO_PHASE = _NoPhase()
+
+
+def phase(name, **fields):
+    """
+    Times a with block and reports it as a 'phase' event. The dict returned by `with`
+    can be filled with the outcome of the phase. Does nothing while no sink is installed.
+    """
+    return _Phase(name, fields) if enabled else _NO_PHASE
+
+
+class Counters:
+    """
+    Sink adding up events in memory: event counts, sums of the numeric fields and phase times.
+    """
+
+    def __init__(self):
+        from collections import Counter, defaultdict
+
+        self.events = Counter()  # event name -> number of events
+        self.totals = Counter()  # 'event.field' -> sum of the field
+        self.times = defaultdict(float)  # phase -> seconds
+
+    def __call__(self, event):
+        name = event['event']
+        self.events[name] += 1
+        if name == 'phase':
+            self.events['phase.' + event['phase']] += 1
+            self.times[event['phase']] += event['elapsed']
+            return
+        for field, value in event.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                self.totals[name + '.' + field] += value
+            elif value is True:
+                self.totals[name + '.' + field] += 1
+
+    def summary(self):
+        """
+        :return: JSON-serialisable dict of everything counted so far.
+        """
+        return {'events': dict(self.events), 'totals': dict(self.totals), 'times': dict(self.times)}
+
+
+class JsonLinesSink:
+    """
+    Sink writing every event as one line of JSON.
+    """
+
+    def __init__(self, target):
+        """
+        :param target: Path of the file to append to, or a text file object.
+        """
+        import json
+
+        self._dumps = json.dumps
+        self._owned = isinstance(target, str)
+        # one write per line, so that processes appending to the same file do not mix their lines
+        self.file = open(target, 'a', buffering=1) if self._owned else target
+
+    def __call__(self, event):
+        self.file.write(self._dumps(event) + '\n')
+
+    def close(self):
+        if self._owned:
+            self.file.close()
@@ -0,0 +1,79 @@
+"""
+Validity-preserving transformations of a sudoku: digit relabelling, row and
+column swaps within a band or stack, band and stack swaps and transposition.
+
+A transformed puzzle keeps its single solution and needs the same solving
+techniques, so one expensive generated puzzle can be multiplied into many
+equally hard ones. Every transformation is precomputed as a cell permutation
+(applied in one call of an itemgetter) and a digit table (applied with
+bytes.translate), so a variant costs no per-cell Python code.
+"""
+
+from operator import itemgetter
+from random import Random
+
+
+class Transform:
+    """
+    One symmetry of the sudoku grid, applicable to any number of grids.
+    """
+
+    __slots__ = ('cells', 'digits', '_gather')
+
+    def __init__(self, rows=tuple(range(9)), cols=tuple(range(9)), transpose=False, digits=tuple(range(1, 9+1))):
+        """
+        :param rows: Source row of each of the 9 rows of the result, must keep the rows of a band together.
+        :param cols: Source column of each of the 9 columns of the result, likewise for the stacks.
+        :param transpose: Whether to mirror the grid on its main diagonal after moving the rows and columns.
+        :param digits: New digit of each of the digits 1-9.
+        """
+        if transpose:
+            self.cells = tuple(rows[col] * 9 + cols[row] for row in range(9) for col in range(9))
+        else:
+            self.cells = tuple(rows[row] * 9 + cols[col] for row in range(9) for col in range(9))
+        self.digits = bytes.maketrans(bytes(range(10)), bytes((0,) + tuple(digits)))
+        self._gather = itemgetter(*self.cells)
+
+    def apply(self, grid):
+        """
+        :param grid: Flat grid of 81 cell values (0 for a blank).
+        :return: Transformed grid as a list.
+        """
+        return list(bytes(self._gather(grid)).translate(self.digits))
+
+    @classmethod
+    def random(cls, rng):
+        """
+        :param rng: random.Random instance to draw the transformation from.
+        :return: One of the 2 * 6^8 * 9! transformations, uniformly at random.
+        """
+        def lines():
+            blocks = rng.sample(range(3), 3)
+            return tuple(block * 3 + line for block in blocks for line in rng.sample(range(3), 3))
+
+        return cls(lines(), lines(), rng.random() < 0.5, rng.sample(range(1, 9+1), 9))
+
+
+def multiply_puzzle(solved, unsolved, count, seed=None):
+    """
+    Derives distinct games from one generated game, the game itself comes first.
+    :param solved: Flat solved grid of the game.
+    :param unsolved: Flat grid of the game as given to the player.
+    :param count: Number of games to yield.
+    :param seed: Seed of the transformations, random ones by default.
+    :return: Generator of (solved, unsolved) flat grids.
+    """
+    rng = Random(seed)
+    seen = {bytes(unsolved)}
+    yield list(solved), list(unsolved)
+    produced = 1
+    # symmetric puzzles map onto themselves under some transformations, those are skipped
+    while produced < count:
+        transform = Transform.random(rng)
+        variant = transform.apply(unsolved)
+        key = bytes(variant)
+        if key in seen:
+            continue
+        seen.add(key)
+        produced += 1
+        yield transform.apply(solved), variant
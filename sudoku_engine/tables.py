@@ -0,0 +1,50 @@
+"""
+Index tables of the 9x9 grid, built once at import and shared by the engine
+and the GUI, so that no hot path has to work out rows, columns and boxes from
+cell IDs with divisions and modulos.
+
+Cells are numbered 0-80 row by row. Units are numbered 0-26: the 9 rows, then
+the 9 columns, then the 9 boxes (left to right, top to bottom).
+"""
+
+ROW_OF = tuple(cell // 9 for cell in range(81))
+COL_OF = tuple(cell % 9 for cell in range(81))
+BOX_OF = tuple(cell // 27 * 3 + cell % 9 // 3 for cell in range(81))
+
+# the 9 rows, 9 columns and 9 boxes, as tuples of cell IDs
+UNITS = (tuple(tuple(cell for cell in range(81) if ROW_OF[cell] == row) for row in range(9))
+         + tuple(tuple(cell for cell in range(81) if COL_OF[cell] == col) for col in range(9))
+         + tuple(tuple(cell for cell in range(81) if BOX_OF[cell] == box) for box in range(9)))
+ROWS, COLS, BOXES = UNITS[:9], UNITS[9:18], UNITS[18:]
+# the 3 bands of rows (and stacks of columns) that the boxes are made of
+BAND_OF_ROW = tuple(row // 3 for row in range(9))
+STACKS = ((0, 1, 2), (3, 4, 5), (6, 7, 8))
+
+# (row, column, box) unit IDs of every cell, and the cells of these 3 units
+UNIT_IDS_OF = tuple((ROW_OF[cell], 9 + COL_OF[cell], 18 + BOX_OF[cell]) for cell in range(81))
+UNITS_OF = tuple(tuple(UNITS[unit] for unit in UNIT_IDS_OF[cell]) for cell in range(81))
+
+# cells sharing a row, column or box with the given one (the cell itself excluded)
+PEERS = tuple(tuple(other for other in range(81) if other != cell and (
+    ROW_OF[other] == ROW_OF[cell] or COL_OF[other] == COL_OF[cell] or BOX_OF[other] == BOX_OF[cell]))
+    for cell in range(81))
+# the peers and the cell itself, for membership tests
+AREA = tuple(frozenset(PEERS[cell] + (cell,)) for cell in range(81))
+
+
+def _segments():
+    """
+    :return: (segment, rest of its line, rest of its box) for the 54 intersections of a box with a row or a column.
+    """
+    segments = []
+    for line in UNITS[:18]:
+        for box in BOXES:
+            segment = tuple(cell for cell in line if cell in box)
+            if segment:
+                segments.append((segment,
+                                 tuple(cell for cell in line if cell not in segment),
+                                 tuple(cell for cell in box if cell not in segment)))
+    return tuple(segments)
+
+
+SEGMENTS = _segments()
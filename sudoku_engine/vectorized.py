@@ -0,0 +1,127 @@
+"""
+Candidate bookkeeping and single-digit inference for many grids at once.
+
+A batch of N grids is held as an (N, 81) uint8 array and every step below is
+a handful of NumPy operations over the whole batch: candidate masks, naked
+singles (a cell with one candidate) and hidden singles (a digit with one
+place left in a unit). Most easy puzzles are solved by these alone, so a bulk
+job only needs the per-puzzle search for what is left.
+
+This is the only module of the engine that needs NumPy.
+"""
+
+import numpy as np
+
+from sudoku_engine.candidates import ALL_DIGITS, POPCOUNT
+from sudoku_engine.search import solve
+from sudoku_engine.tables import UNIT_IDS_OF, UNITS
+
+_UNITS = np.array(UNITS, dtype=np.intp)  # (27, 9) cell IDs
+_ROW_UNIT, _COL_UNIT, _BOX_UNIT = np.array(UNIT_IDS_OF, dtype=np.intp).T  # (81,) unit IDs each
+_BIT = np.array([0] + [1 << (digit - 1) for digit in range(1, 9+1)], dtype=np.uint16)
+_POPCOUNT = np.array(POPCOUNT, dtype=np.uint8)
+_DIGIT_OF = np.zeros(ALL_DIGITS + 1, dtype=np.uint8)  # digit of the single-digit masks, 0 for the others
+_DIGIT_OF[_BIT[1:]] = np.arange(1, 9+1)
+
+
+def as_board(grids):
+    """
+    :param grids: (N, 81) array, or sequence of flat grids of 81 cell values (0 for a blank).
+    :return: (N, 81) uint8 array, a copy of the input.
+    """
+    if isinstance(grids, np.ndarray):
+        return grids.astype(np.uint8).reshape(-1, 81)
+    return np.frombuffer(b''.join(bytes(grid) for grid in grids), dtype=np.uint8).reshape(-1, 81).copy()
+
+
+def unit_masks(board):
+    """
+    :return: (N, 27) masks of the digits placed in the rows, columns and boxes of every grid,
+        and an (N,) bool array of the grids holding a digit twice in a unit.
+    """
+    bits = _BIT[board[:, _UNITS]]  # (N, 27, 9)
+    used = np.bitwise_or.reduce(bits, axis=2)
+    repeated = (_POPCOUNT[used] != np.count_nonzero(bits, axis=2)).any(axis=1)
+    return used, repeated
+
+
+def candidate_masks(board, used=None):
+    """
+    :param used: unit_masks() of the board, computed here if not given.
+    :return: (N, 81) uint16 masks of the digits that can still be put into every blank, 0 for the filled cells.
+    """
+    if used is None:
+        used, _ = unit_masks(board)
+    masks = ALL_DIGITS & ~(used[:, _ROW_UNIT] | used[:, _COL_UNIT] | used[:, _BOX_UNIT])
+    masks[board != 0] = 0
+    return masks
+
+
+def naked_singles(board, masks):
+    """
+    :return: (N, 81) digits of the blanks with a single candidate, 0 elsewhere.
+    """
+    return np.where(board == 0, _DIGIT_OF[masks], 0).astype(np.uint8)
+
+
+def hidden_singles(masks):
+    """
+    :return: (N, 81) digits that have a single place left in one of the units of a cell, 0 elsewhere.
+        A cell claimed by two digits (a contradiction) is left at 0.
+    """
+    cells = masks[:, _UNITS]  # (N, 27, 9)
+    once = np.zeros(cells.shape[:2], dtype=np.uint16)
+    twice = np.zeros_like(once)
+    for position in range(9):
+        twice |= once & cells[:, :, position]
+        once |= cells[:, :, position]
+    unique = once & ~twice  # digits with exactly one place in the unit
+    return _DIGIT_OF[masks & (unique[:, _ROW_UNIT] | unique[:, _COL_UNIT] | unique[:, _BOX_UNIT])]
+
+
+def propagate(board):
+    """
+    Fills in naked and hidden singles until no grid of the batch changes any more.
+    Grids that are complete, contradictory or stuck drop out of the computation early.
+    :param board: (N, 81) uint8 array, left untouched.
+    :return: (board, solved, failed): the filled-in copy, and (N,) bool arrays of the grids that were
+        solved and of the grids shown to have no solution (repeated or exhausted digits).
+    """
+    board = board.copy()
+    failed = np.zeros(len(board), dtype=bool)
+    active = np.flatnonzero((board == 0).any(axis=1))
+    while len(active):
+        current = board[active]
+        used, repeated = unit_masks(current)
+        masks = candidate_masks(current, used)
+        blanks = current == 0
+        dead = repeated | (blanks & (masks == 0)).any(axis=1)
+        failed[active[dead]] = True
+
+        found = naked_singles(current, masks)
+        found = np.where(found != 0, found, hidden_singles(masks))
+        found[dead] = 0
+        progress = (found != 0).any(axis=1)
+        board[active] = current + found
+        still_open = (board[active] == 0).any(axis=1)
+        active = active[progress & still_open]
+
+    # the last round may have put a digit twice into a unit
+    _, repeated = unit_masks(board)
+    failed |= repeated
+    solved = ~failed & (board != 0).all(axis=1)
+    return board, solved, failed
+
+
+def solve_batch(grids, backend='mrv'):
+    """
+    Solves a batch of grids, the grids that propagate() cannot finish are searched one by one.
+    :param grids: (N, 81) array, or sequence of flat grids of 81 cell values (0 for a blank).
+    :param backend: Search algorithm for the rest, see sudoku_engine.search.BACKENDS.
+    :return: List of solutions as flat lists of 81 digits, None for the grids without a solution.
+    """
+    board, solved, failed = propagate(as_board(grids))
+    solutions = board.tolist()
+    for index in np.flatnonzero(~solved):
+        solutions[index] = None if failed[index] else solve(solutions[index], backend)
+    return solutions
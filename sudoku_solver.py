@@ -6,54 +6,60 @@ Created on Mon Dec 23 12:43:55 2019
 @author: sqky
 """
 
-from copy import deepcopy
-from math import floor
+from sudoku_engine import CandidateMasks, Grid
+from sudoku_engine import solve as solve_flat
 
 
-def solve(input_grid):
-    grid = deepcopy(input_grid)
+def solve(input_grid, backend='backtrack'):
+    # backend: 'backtrack' for predict() below, 'mrv' or 'dlx' for the sudoku_engine searches
+    # the grid is validated and copied at once, the input is left untouched
+    cells = Grid(input_grid)
+    if backend == 'backtrack':
+        grid = cells.rows()
+        solved = predict(grid)
+    else:
+        solution = solve_flat(cells, backend)
+        solved = solution is not None
+        if solved:
+            grid = [solution[row*9: row*9+9] for row in range(9)]
 
-    if predict(grid):
+    if solved:
         return grid
     else:
         print('Solution does not exist.')
 
 
-def predict(grid, row=0, col=0):
+def predict(grid, row=0, col=0, masks=None):
+    # free digits of every row, column and box, kept in sync with the grid
+    if masks is None:
+        try:
+            masks = CandidateMasks([value for line in grid for value in line])
+        except ValueError:
+            return False
+
+    next_pos_tuple = get_next_pos(row, col)
     # this place is empty (equal to 0)
     if grid[row][col] == 0:
-        in_row = grid[row]
-        in_col = [ grid[i][col] for i in range(9) ]
-        in_box = [ grid[floor(row/3)*3 + i][floor(col/3)*3 + j] for i in range(3) for j in range(3) ]
-
-        i = 1
-        while i <= 9:
-            # i is not in elsewhere in this row, column or box
-            if i not in in_row and i not in in_col and i not in in_box:
-                grid[row][col] = i
-                next_pos_tuple = get_next_pos(row, col)
-                if next_pos_tuple is None:
-                    return True
-
-                if predict(grid, next_pos_tuple[0], next_pos_tuple[1]):
-                    return True
-            # i is already somewhere in this row, column or box
-            else:
-                if i == 9:
-                    grid[row][col] = 0
-                    return False
-                else:
-                    i += 1
+        cell = row*9 + col
+        # digits that are not elsewhere in this row, column or box
+        for i in masks.digits(cell):
+            grid[row][col] = i
+            if next_pos_tuple is None:
+                return True
+
+            masks.place(cell, i)
+            if predict(grid, next_pos_tuple[0], next_pos_tuple[1], masks):
+                return True
+            masks.unplace(cell, i)
+
+        grid[row][col] = 0
+        return False
     # there is already a number in this place
     else:
-        next_pos_tuple = get_next_pos(row, col)
         if next_pos_tuple is None:
             return True
 
-        if predict(grid, next_pos_tuple[0], next_pos_tuple[1]):
-            return True
-        else:
-            return False
+        return predict(grid, next_pos_tuple[0], next_pos_tuple[1], masks)
 
 
 def get_next_pos(row, col):
@@ -97,12 +103,13 @@ example_2 = [[0, 0, 0, 0, 0, 0, 6, 8, 0],
              [0, 2, 8, 0, 0, 0, 0, 0, 0]]
 
 
-solution = solve(example_1)
-for i in solution:
-    print(i)
+if __name__ == '__main__':
+    solution = solve(example_1)
+    for i in solution:
+        print(i)
 
-print()
+    print()
 
-solution = solve(example_2)
-for i in solution:
-    print(i)
+    solution = solve(example_2)
+    for i in solution:
+        print(i)
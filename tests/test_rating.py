@@ -0,0 +1,52 @@
+import os
+import sys
+import unittest
+from random import Random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sudoku_engine.generator import generate_puzzle  # noqa: E402
+from sudoku_engine.rating import RATING_BANDS, rate  # noqa: E402
+from sudoku_engine.symmetry import Transform  # noqa: E402
+
+# puzzles of the 'hard' band needing eliminations, with the hardest technique each one needs
+HARD_PUZZLES = (
+    ('069080000074350000200600470300000005000506000400000002092003007000025390000060280', 'pointing'),
+    ('070020508000903460030000100600050000500308009000090004005000040012509000307060020', 'box-line reduction'),
+    ('000060001050480060100305000035900000620000015000003640000102008010038020800070000', 'box-line reduction'),
+    ('900500007100000080007000620365020000000000000000040965042000300070000001800009002', 'naked triple'),
+)
+
+
+class TransformedRatingTest(unittest.TestCase):
+    """
+    Relabelling digits and moving rows and columns must not change how hard a puzzle rates.
+    """
+
+    def test_variants_rate_like_their_puzzle(self):
+        rng = Random(2019)
+        for difficulty in ('easy', 'medium', 'hard'):
+            for seed in range(3):
+                solved, unsolved = generate_puzzle(difficulty, seed=seed)
+                rating = rate(unsolved)
+                for _ in range(30):
+                    transform = Transform.random(rng)
+                    with self.subTest(difficulty=difficulty, seed=seed, cells=transform.cells):
+                        self.assertEqual(rate(transform.apply(unsolved)), rating)
+
+    def test_variants_of_hard_puzzles_rate_like_their_puzzle(self):
+        rng = Random(2019)
+        lowest, highest = RATING_BANDS['hard']
+        for puzzle, hardest in HARD_PUZZLES:
+            unsolved = [int(value) for value in puzzle]
+            rating = rate(unsolved)
+            self.assertEqual(rating.hardest, hardest)
+            self.assertTrue(lowest <= rating.score <= highest)
+            for _ in range(100):
+                transform = Transform.random(rng)
+                with self.subTest(puzzle=puzzle, cells=transform.cells):
+                    self.assertEqual(rate(transform.apply(unsolved)), rating)
+
+
+if __name__ == '__main__':
+    unittest.main()